@@ -10,35 +10,94 @@ __author__ = "Jordan Memphis Leef"
 __license__ = "Freeware"
 __copyright__ = "Copyright (C) Jordan Memphis Leef"
 
-from typing import Union, List, Dict, Tuple, Generator, Optional, Any
+from typing import Union, List, Dict, Tuple, Generator, Iterator, Optional, Any, BinaryIO, Callable
+from concurrent.futures import ProcessPoolExecutor
 from pyspin.spin import Spin1, Spinner
 from colorama import Fore, Style
+from collections.abc import Mapping, Set
+from collections import OrderedDict, Counter
 import itertools as it
 import numpy as np
 import subprocess
+import contextlib
+import functools
+import importlib
+import heapq
+import argparse
+import hashlib
+import csv
+import importlib.util
 import os.path
+import shutil
 import random
-import msvcrt
+import struct
 import ctypes
 import errno
 import json
+import math
 import time
+import traceback
 import copy
+import lzma
+import zlib
 import sys
 import ast
+import io
 import re
 
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None # Only available on Windows, the headless simulation does not need it
+
 # Global constant declaration
 PY_VERSION = 3.8 # The Python version that the game is programmed on
 SW_MAXIMISE = 3 # Set the command prompt to open in maximized window
 LOWER_LIMIT = 3 # The min board length
 UPPER_LIMIT = 15 # The max board length
 CHAR_LIMIT = 20 # Character limit
+EMPTY_CELL = ord(" ") # The letter code of an empty cell on the board
 COMPUTER_PLAYER_NAME = "Computer" # To distinguish itself from human players
+DIFFICULTIES = ("EASY", "MEDIUM", "HARD", "MCTS", "SOLVER") # The difficulties of the official agents
+AGENT_TIME_BUDGET = None # How many seconds an official agent thinks about each move, None runs a fixed number of rollouts for its difficulty
+MCTS_ITERATIONS = 64 # How many rollouts the MCTS agent runs for each move
+MCTS_EXPLORATION = 1.4 # How much the MCTS agent favours moves it has rarely tried
+MCTS_WIDENING = 2 # The MCTS agent tries at most MCTS_WIDENING * visits ** MCTS_WIDENING_POWER moves from a position
+MCTS_WIDENING_POWER = 0.5 # How fast the moves tried from a position grow with its visits
+SOLVER_EMPTY_CELLS = 6 # The solver agent only tries to solve positions with at most this many empty cells
+SOLVER_NODE_LIMIT = 10000 # The most positions the solver searches for one move before giving up
+SOLVER_TABLE_SIZE = 1 << 18 # The most solved positions the solver remembers
+TRANSPOSITION_TABLE_SIZE = 1 << 18 # The most positions an transposition table remembers before the least recently used are forgotten
+ZOBRIST_SEED = "Word Battle" # Seeds the random keys of the position hashes, so every process hashes a position the same way
 LOCAL_DIR_VOCABULARY = "./Vocabulary/" # The path to the "Vocabulary" folder
 LOCAL_DIR_RECORDS = "./Records/" # The path to the "Records" folder
 LOCAL_DIR_REPLAYS = "./Replays/" # The path to the "Replays" folder
+LOCAL_DIR_CACHE = "./Cache/" # The path to the "Cache" folder
 REPLAY_FILE_FORMAT = ".wbr" # The format for the replay files
+REPLAY_FILE_MAGIC = b"WBR\x02" # The first bytes of an binary replay file, the last byte is the version
+REPLAY_COMPRESSION = "zlib" # How the events of new replay files are compressed
+REPLAY_COMPRESSIONS = ("none", "zlib", "lzma") # The supported compressions, stored by their index
+REPLAY_EVENTS = ("END", "PLAYING", "RESIGNED", "WON", "DRAW") # The event types of an replay, stored by their index
+REPLAY_CHUNK_SIZE = 65536 # How many bytes of an replay file are read at a time
+REPLAY_KEYFRAME_INTERVAL = 8 # The replay viewer keeps the board of every this many events, so any turn is drawn after replaying at most this many events
+REPLAY_ARCHIVE_FORMAT = ".wba" # The format for the replay archives, which hold every game of a simulation run
+REPLAY_INDEX_FORMAT = ".wbi" # The format for the index of an replay archive
+REPLAY_INDEX_MAGIC = b"WBI1" # The first bytes of an replay archive index, the digit is the version
+REPLAY_INDEX_RECORD = struct.Struct('<QIIHBb') # The offset, size, game number, turns, board length and winner of each archived game
+SIMULATION_CHUNK_SIZE = 1000 # The most games simulated in one go by a worker
+ANALYSIS_CHUNK_SIZE = 256 # The most replays analysed in one go by a worker
+ANALYSIS_TOP_WORDS = 20 # How many of the most decisive words the analysis reports
+LEXICON_FILE_FORMAT = ".wbl" # The format for the compiled lexicon files
+LEXICON_FILE_MAGIC = b"WBL1" # The first bytes of an compiled lexicon file, the digit is the version
+LEXICON_BACKEND = "bitset" # How the lexicons match patterns, "bitset" intersects the letter index and "mask" compares the letter arrays
+LEXICON_BACKENDS = ("bitset", "mask") # The supported pattern matching backends
+BOOK_FILE = f"{LOCAL_DIR_CACHE}opening_book.wbo" # The opening book of the official agents
+BOOK_FILE_MAGIC = b"WBO1" # The first bytes of an opening book file, the digit is the version
+BOOK_RECORD = struct.Struct('<QBBHBB') # The position hash, board length, vocabulary, starting position, path number and word length of each book move, followed by the word
+BOOK_DIFFICULTIES = ("EASY", "MEDIUM", "HARD") # The difficulties whose vocabularies the opening book is built for, the other difficulties use the HARD vocabulary
+BOOK_ITERATIONS = 512 # How many rollouts the book builder runs for each position
+RENDER_INCREMENTAL = True # Redraw only the lines and cells that changed when a screen is drawn again, False clears and draws every frame in full
+PATTERN_CACHE_SIZE = 4096 # The most patterns each lexicon remembers the words of, 0 turns the cache off
 LETTER_VALUE = {"A": 3, "B": 9, "C": 8, "D": 7, "E": 1, "F": 8, "G": 8, "H": 5, "I": 5, "J": 10, "K": 10, "L": 7, "M": 8, "N": 5, "O": 4, "P": 9, "Q": 10, "R": 6, "S": 5, "T": 2, "U": 8, "V": 10, "W": 8, "X": 10, "Y": 9, "Z": 10} # The strength of each letter
 
 CUSTOM_COMPUTER_PLAYER_NAME = "" # To distinguish itself from official computer players and human players
@@ -47,6 +106,7 @@ CUSTOM_COMPUTER_PLAYER_NAME = "" # To distinguish itself from official computer
 game_word_list = {}
 vocab_1 = {}
 vocab_2 = {}
+loaded_lexicons = {} # The lexicons already loaded by this process, keyed by the word list and its modification time
 
 def clear_screen(time_set=1) -> None:
     """Clear the screen."""
@@ -63,6 +123,14 @@ def input_integer(label: str) -> int:
             pass
 
 
+def load_word_lists() -> None:
+    """Load the game word list and the vocabularies of the official agents."""
+    global game_word_list, vocab_1, vocab_2
+    game_word_list = load_lexicon('English.txt')
+    vocab_1 = load_lexicon('vocab_1.txt', True)
+    vocab_2 = load_lexicon('vocab_2.txt', True)
+
+
 def check_if_file_exists(file_name: str, open_in_other_folder=False) -> None:
     try:
         if open_in_other_folder:
@@ -80,7 +148,7 @@ def check_if_file_exists(file_name: str, open_in_other_folder=False) -> None:
         check_if_file_exists(file_name, open_in_other_folder)
 
 
-def categorise_word_by_length(raw_word_list: List[str]) -> Dict:
+def categorise_word_by_length(raw_word_list: List[str]) -> "Lexicon":
     """Categorised each word according to their lengths, this is to improve the computer player in searching for a word."""
     words_categorised = {}
 
@@ -89,7 +157,88 @@ def categorise_word_by_length(raw_word_list: List[str]) -> Dict:
             words_categorised[len(word)] = []
         words_categorised[len(word)].append(word.upper())
 
-    return words_categorised
+    return Lexicon.from_words(words_categorised)
+
+
+def read_lexicon_header(lexicon_file: str) -> Tuple[Optional[Dict], int]:
+    """Read the header of an compiled lexicon file, return the header and where the letter blocks start."""
+    try:
+        with open(lexicon_file, 'rb') as f:
+            if f.read(len(LEXICON_FILE_MAGIC)) != LEXICON_FILE_MAGIC:
+                return None, 0
+
+            header_size = struct.unpack('<I', f.read(4))[0]
+            header = json.loads(f.read(header_size))
+            return header, len(LEXICON_FILE_MAGIC) + 4 + header_size
+    except (OSError, ValueError, struct.error):
+        return None, 0
+
+
+def compile_lexicon(word_list_file: str, lexicon_file: str, signature: Dict[str, Any]) -> None:
+    """Compile the word list into an lexicon file, the words of each length are stored as one fixed-width block of letters."""
+    lexicon = categorise_word_by_length(open(word_list_file).read().splitlines())
+    buckets = {}
+    offset = 0
+
+    for length in sorted(lexicon.letters):
+        buckets[str(length)] = [offset, len(lexicon.letters[length])]
+        offset += lexicon.letters[length].nbytes
+
+    header = json.dumps({**signature, "buckets": buckets}).encode('utf-8')
+
+    # Create the folder if it does not exist
+    try:
+        os.makedirs('Cache')
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            raise
+
+    # Write to a temporary file of this process first so other processes never map a half written file, even if they compile the same word list
+    temp_file = f"{lexicon_file}.{os.getpid()}.tmp"
+
+    with open(temp_file, 'wb') as f:
+        f.write(LEXICON_FILE_MAGIC)
+        f.write(struct.pack('<I', len(header)))
+        f.write(header)
+
+        for length in sorted(lexicon.letters):
+            f.write(lexicon.letters[length].tobytes())
+
+    os.replace(temp_file, lexicon_file)
+
+
+def load_lexicon(file_name: str, open_in_other_folder=False) -> "Lexicon":
+    """Load the word list from its compiled lexicon file, which is memory-mapped. The file is compiled again if the word list has changed."""
+    word_list_file = f"{LOCAL_DIR_VOCABULARY}{file_name}" if open_in_other_folder else file_name
+    file_stat = os.stat(word_list_file)
+    loaded_key = (word_list_file, file_stat.st_mtime_ns, file_stat.st_size)
+
+    if loaded_key in loaded_lexicons:
+        return loaded_lexicons[loaded_key]
+
+    with open(word_list_file, 'rb') as f:
+        signature = {"source": file_name, "mtime": file_stat.st_mtime_ns, "size": file_stat.st_size, "sha1": hashlib.sha1(f.read()).hexdigest()}
+
+    lexicon_file = f"{LOCAL_DIR_CACHE}{os.path.splitext(file_name)[0]}{LEXICON_FILE_FORMAT}"
+    header, data_start = read_lexicon_header(lexicon_file)
+
+    if header is None or any(header.get(key) != value for key, value in signature.items()):
+        compile_lexicon(word_list_file, lexicon_file, signature)
+        header, data_start = read_lexicon_header(lexicon_file)
+
+    # Every length is a view into the same read-only mapping, the pages are shared between processes
+    data = np.memmap(lexicon_file, dtype=np.uint8, mode='r')
+    letters = {}
+
+    for length, (offset, count) in header['buckets'].items():
+        start = data_start + offset
+        letters[int(length)] = data[start:start + count * int(length)].reshape(count, int(length))
+
+    lexicon = Lexicon(letters)
+    lexicon.source = file_name
+    lexicon.sha1 = signature['sha1']
+    loaded_lexicons[loaded_key] = lexicon
+    return lexicon
 
 
 def get_board_length() -> int:
@@ -130,73 +279,244 @@ def get_how_many_games() -> int:
         return get_how_many_games()
 
 
-def open_replay() -> None:
-    """Open .wbr files to watch them."""
-    def run_replay(replay_info: dict, replay_speed: float) -> None:
-        """Run the replay file."""
-        board = Board()
-        board.create_board(replay_info['wbr_game_info'][0]['board_length'])
-        game_duration = replay_info['wbr_game_info'][0]['game_duration']
-        board.game_duration = game_duration
-        players = []
+def set_lexicon_backend(backend: str) -> None:
+    """Choose how the lexicons of this process match patterns, one of LEXICON_BACKENDS."""
+    global LEXICON_BACKEND
 
-        for player in replay_info['wbr_game_info'][1:]:
-            if player['player_name'] not in players:
-                players.append({"name": player['player_name'], "type": player['type'], "difficulty": player['difficulty']})
+    if backend not in LEXICON_BACKENDS:
+        raise ValueError(f"Lexicon backend must be one of {', '.join(LEXICON_BACKENDS)}")
 
-        board.players = [dict(t) for t in {tuple(d.items()) for d in players}]
-        board.player = players[0]['name']
+    LEXICON_BACKEND = backend
 
-        if players[0]['difficulty'] is not None:
-            board.player = f"{players[0]['name']} ({players[0]['difficulty']})"
 
-        board.game_counter = replay_info['wbr_game_info'][0]['game_number']
-        clear_screen(0)
-        board.display_game_title()
-        board.display_board()
-        print(f"Replay speed: {replay_speed}\nReplay file: {file}{REPLAY_FILE_FORMAT}\n")
-
-        for player in replay_info['wbr_game_info'][1:]:
-            event = player['event']
-            player_name = player['player_name']
-            player_type = player['type']
-            board.player = player_name
-
-            if player_type == "computer":
-                player_name = f"{player['player_name']} ({player['difficulty']})"
-
-            if event == 'RESIGNED':
-                clear_screen(1.5) # Do not delete!
-                board.display_game_title(False, False, True) # Do not delete!
-                board.display_board() # Do not delete!
-                print(f"Replay speed: {replay_speed}\nReplay file: {file}{REPLAY_FILE_FORMAT}\n") # Do not delete!
-                clear_screen(1.5)
-                board.display_game_title(False, False, True)
-            elif event == 'WON':
-                board.winner = player_name
-                clear_screen(0)
-                board.display_game_title(False, True)
-            elif event == 'PLAYING':
-                board.turn_counter += 1
-                board.selected_path = [tuple(i) for i in player['selected_path']]
-                board.place_word(player['word'])
-                board.previous_player = player_name
-                clear_screen(replay_speed)
-                board.display_game_title()
-            elif event == 'DRAW':
-                board.draw = True
-                clear_screen(1)
-                board.display_game_title(True)
-
-            board.display_board()
-            print(f"Replay speed: {replay_speed}\nReplay file: {file}{REPLAY_FILE_FORMAT}\n")
+@functools.lru_cache(maxsize=None)
+def get_path_table(board_length: int) -> "Path_Table":
+    """Get the path table of a board length, it is only made once."""
+    return Path_Table(board_length)
+
+
+@functools.lru_cache(maxsize=None)
+def get_board_frame(board_length: int) -> "Board_Frame":
+    """Get the static grid of a board length, it is only made once."""
+    return Board_Frame(board_length)
+
+
+def lazy_shuffle(items: List[Any], rng=random) -> Generator[Any, Any, None]:
+    """Yield the items in a random order, only shuffling as far as the caller reads so stopping early costs nothing. The list is not changed."""
+    swapped = {} # The item now at each position that has been swapped, as in a Fisher-Yates shuffle
+
+    for n in range(len(items)):
+        position = rng.randrange(n, len(items))
+        yield items[swapped.get(position, position)]
+        swapped[position] = swapped.get(n, n)
+
+
+@functools.lru_cache(maxsize=None)
+def get_cell_keys(board_length: int) -> List[List[List[int]]]:
+    """Get the random key of every letter code on every cell of a board length, an empty cell has the key 0."""
+    rng = random.Random(f"{ZOBRIST_SEED}:{board_length}")
+    return [[[0 if letter == EMPTY_CELL else rng.getrandbits(64) for letter in range(256)] for _ in range(board_length)] for _ in range(board_length)]
+
+
+@functools.lru_cache(maxsize=None)
+def get_word_key(word: str) -> int:
+    """Get the random key of an used word."""
+    return int.from_bytes(hashlib.blake2b(f"{ZOBRIST_SEED}:{word}".encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+@functools.lru_cache(maxsize=None)
+def get_transposition_table(difficulty: str) -> "Transposition_Table":
+    """Get the transposition table of a difficulty, it is shared by every agent of that difficulty in this process."""
+    return Transposition_Table()
+
+
+@functools.lru_cache(maxsize=None)
+def get_solver(difficulty: str) -> "Solver":
+    """Get the solver of a difficulty, it searches with the vocabulary of that difficulty and remembers its solved positions for the life of this process."""
+    return Solver(get_vocabulary(difficulty))
+
+
+@functools.lru_cache(maxsize=None)
+def get_opening_book() -> "Opening_Book":
+    """Get the opening book, it is only read once."""
+    return Opening_Book.load(BOOK_FILE)
+
+
+@functools.lru_cache(maxsize=None)
+def load_agent_class(agent: str) -> type:
+    """Load the class of an custom agent from "MODULE:CLASS", the module is a module name or the path of a python file.
+    The class is Custom_Agent if it is left out, and the module is this file if that is left out too."""
+    module_name, _, class_name = agent.rpartition(":")
+
+    # A Windows path has a colon of its own, so the part after the last colon is only the class if it can be one
+    if not class_name.isidentifier():
+        module_name, class_name = agent, ""
+
+    if not module_name:
+        module = sys.modules[__name__]
+    elif module_name.endswith(".py") or os.sep in module_name or "/" in module_name:
+        spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(module_name))[0], module_name)
+
+        if spec is None:
+            raise ImportError(f"Cannot load an agent from {module_name}")
+
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    else:
+        module = importlib.import_module(module_name)
+
+    agent_class = getattr(module, class_name or "Custom_Agent")
+
+    if not callable(getattr(agent_class, "choose_move", None)):
+        raise TypeError(f"{agent} has no choose_move method")
+
+    return agent_class
+
+
+def get_vocabulary(difficulty: str) -> "Lexicon":
+    """Get the vocabulary the official agents of a difficulty play with."""
+    if difficulty == "EASY":
+        return vocab_1
+    elif difficulty == "MEDIUM":
+        return vocab_2
+    else:
+        return game_word_list
+
+
+def get_start_paths(board_length: int, starting_position: Tuple[int, int]) -> Tuple[Tuple[Tuple[int, int], ...], ...]:
+    """Get the three paths from a starting position in the order create_valid_paths makes them."""
+    return get_path_table(board_length).paths[starting_position]
+
+
+def is_binary_replay(file_name: str) -> bool:
+    """Check if an replay file is in the binary format."""
+    with open(file_name, 'rb') as f:
+        return f.read(len(REPLAY_FILE_MAGIC)) == REPLAY_FILE_MAGIC
+
+
+def read_legacy_replay(file_name: str) -> List[Dict[str, Any]]:
+    """Read an replay file written before the binary format, which has one decimal byte value per line."""
+    with open(file_name) as f:
+        return ast.literal_eval("".join(map(chr, [int(i) for i in f.read().splitlines()])))
+
+
+def load_replay(file_name: str) -> List[Dict[str, Any]]:
+    """Load the game info and every event of an replay file in either format."""
+    if not is_binary_replay(file_name):
+        return read_legacy_replay(file_name)
+
+    with open(file_name, 'rb') as f:
+        reader = Replay_Reader(f)
+        return [reader.game_info] + list(reader.events())
+
+
+def write_replay(file: BinaryIO, replay_info: List[Dict[str, Any]], compression=REPLAY_COMPRESSION) -> None:
+    """Write the game info and every event of a game in the binary replay format."""
+    players = []
+
+    for event in replay_info[1:]:
+        if (event['player_name'], event['type'], event['difficulty']) not in players:
+            players.append((event['player_name'], event['type'], event['difficulty']))
+
+    writer = Replay_Writer(file, replay_info[0]['game_number'], replay_info[0]['board_length'], players, compression)
+
+    for event in replay_info[1:]:
+        writer.write_event(event)
+
+    writer.close(replay_info[0].get('game_duration', "00:00:00"))
+
+
+def encode_replay(replay_info: List[Dict[str, Any]], compression=REPLAY_COMPRESSION) -> bytes:
+    """Encode a game in the binary replay format."""
+    file = io.BytesIO()
+    write_replay(file, replay_info, compression)
+    return file.getvalue()
+
+
+def convert_replay(file_name: str, compression=REPLAY_COMPRESSION) -> bool:
+    """Convert an replay file from the old format to the binary format, return False if it is already binary."""
+    if is_binary_replay(file_name):
+        return False
+
+    replay_info = read_legacy_replay(file_name)
+
+    with open(f"{file_name}.tmp", 'wb') as f:
+        write_replay(f, replay_info, compression)
+
+    os.replace(f"{file_name}.tmp", file_name)
+    return True
+
+
+def open_replay() -> None:
+    """Open .wbr files to watch them."""
+    def run_replay(replay_info: dict, replay_speed: float, frame=0) -> None:
+        """Run the replay file from an event, the first event if none is given."""
+        timeline = replay_info['timeline']
+        footer = [f"Replay speed: {replay_speed}", f"Replay file: {file}{REPLAY_FILE_FORMAT}", ""]
+        board, title = timeline.seek(frame)
+        board.renderer.clear()
+        board.refresh_screen(title, footer)
+
+        for player in timeline.events[frame:]:
+            # The screen is drawn in place, only the title and the cells that changed are drawn again
+            if player['event'] == 'RESIGNED':
+                time.sleep(1.5) # Do not delete!
+                board.refresh_screen(timeline.play_event(board, player), footer) # Do not delete!
+                time.sleep(1.5)
+                title = board.get_game_title(False, False, True)
+            else:
+                if player['event'] == 'PLAYING':
+                    time.sleep(replay_speed)
+                elif player['event'] == 'DRAW':
+                    time.sleep(1)
+
+                title = timeline.play_event(board, player)
+
+            board.refresh_screen(title, footer)
 
         print("Replay finished, press any key to continue...")
         msvcrt.getch()
 
+    def step_replay(replay_info: dict, replay_speed: float) -> None:
+        """Step through the replay file one event at a time or jump to a turn, each is drawn from the keyframe before it."""
+        timeline = replay_info['timeline']
+        frame = 0
+
+        while True:
+            board, title = timeline.seek(frame)
+
+            if frame == 0:
+                board.renderer.clear()
+
+            board.refresh_screen(title, [f"Replay file: {file}{REPLAY_FILE_FORMAT}", f"Event {frame} of {len(timeline.events)} | Turn {board.turn_counter} of {timeline.turns}", "", "[A] Back | [D] Forward | [G] Go to turn | [P] Play from here | [Q] Replay menu"])
+            key = msvcrt.getch()
+
+            # The arrow keys are read as two characters
+            if key in (b'\x00', b'\xe0'):
+                key = {b'K': b'a', b'M': b'd'}.get(msvcrt.getch(), b'')
+
+            key = key.lower()
+
+            if key == b'a':
+                frame = max(frame - 1, 0)
+            elif key == b'd':
+                frame = min(frame + 1, len(timeline.events))
+            elif key == b'g':
+                turn = input_integer(Fore.WHITE + Style.BRIGHT + f"Turn (0 to {timeline.turns}): ")
+                frame = timeline.get_turn_event(min(max(turn, 0), timeline.turns))
+            elif key == b'p':
+                run_replay(replay_info, replay_speed, frame)
+                return
+            elif key == b'q':
+                return
+
+    def replay_menu(replay_info: dict, replay_speed: float) -> None:
+        """Watch the replay file, then ask what to do next."""
+        run_replay(replay_info, replay_speed)
+
         while True:
             clear_screen(0)
-            print(Fore.WHITE + Style.BRIGHT + "Replay menu\n[1] Watch again\n[2] Change speed and watch again\n[3] Open another file\n[4] Go back to main menu\n")
+            print(Fore.WHITE + Style.BRIGHT + "Replay menu\n[1] Watch again\n[2] Change speed and watch again\n[3] Step through turns\n[4] Open another file\n[5] Go back to main menu\n")
 
             try:
                 selection = int(input((Fore.WHITE + Style.BRIGHT + "Selection: ")))
@@ -204,31 +524,45 @@ def open_replay() -> None:
                     run_replay(replay_info, replay_speed)
                 elif selection == 2:
                     clear_screen(0)
-                    get_replay_speed(replay_info)
+                    replay_speed = get_replay_speed()
+                    run_replay(replay_info, replay_speed)
                 elif selection == 3:
-                    clear_screen(0)
-                    open_replay()
+                    step_replay(replay_info, replay_speed)
                 elif selection == 4:
+                    clear_screen(0)
+                    return
+                elif selection == 5:
                     main()
                 else:
                     pass
             except ValueError:
                 pass
 
-    def get_replay_speed(replay_info: dict) -> None:
+    def get_archive_game(name: str) -> List[Dict[str, Any]]:
+        """Ask which game of an replay archive to watch and load it."""
+        archive = Replay_Archive(name)
+        archive.open()
+
+        while True:
+            game_number = input_integer(Fore.WHITE + Style.BRIGHT + f"Game number (1 to {len(archive)}): ")
+
+            if 1 <= game_number <= len(archive):
+                return archive.load_game(game_number)
+
+    def get_replay_speed() -> float:
         """Set how fast each turn cycles."""
         try:
             replay_speed = float(input("Replay speed. Type 0 to go back to main menu: "))
             if replay_speed > 0:
-                run_replay(replay_info, replay_speed)
+                return replay_speed
             elif replay_speed == 0:
                 main()
             else:
                 clear_screen(0)
-                get_replay_speed(replay_info)
+                return get_replay_speed()
         except ValueError:
             clear_screen(0)
-            get_replay_speed(replay_info)
+            return get_replay_speed()
 
     while True:
         file = input(Fore.WHITE + Style.BRIGHT + "Filename (Type 0 to go back to main menu): ")
@@ -249,25 +583,24 @@ def open_replay() -> None:
                 if e.errno != errno.EEXIST:
                     raise
 
-            if os.path.isfile(f"{LOCAL_DIR_REPLAYS}{file}{REPLAY_FILE_FORMAT}"):
+            if os.path.isfile(f"{LOCAL_DIR_REPLAYS}{file}{REPLAY_FILE_FORMAT}") or os.path.isfile(f"{LOCAL_DIR_REPLAYS}{file}{REPLAY_INDEX_FORMAT}"):
                 try:
-                    with open(f"{LOCAL_DIR_REPLAYS}{file}{REPLAY_FILE_FORMAT}") as f:
-                        bytes_data = f.read().splitlines()
-                        data = ast.literal_eval("".join(map(chr, [int(i) for i in bytes_data])))
-                        wbr_content = {"wbr_game_info": data}
-                        replay_info = json.dumps(wbr_content, indent=7)
-                        replay_info = json.loads(replay_info)
-
-                        if replay_info['wbr_game_info'][0]['game_number'] > 0 and replay_info['wbr_game_info'][0]['board_length'] > 0:
-                            clear_screen(0)
-                            get_replay_speed(replay_info)
-                        else:
-                            clear_screen(0)
-                            print(Fore.WHITE + Style.BRIGHT + "Filename (Type 0 to go back to main menu): " + Fore.RED + Style.BRIGHT + "File not found or file extension not supported! Only .wbr (Word Battle Replay) files are supported.")
-                            print(Fore.WHITE + Style.BRIGHT + "Press any key to continue...")
-                            msvcrt.getch()
-                            clear_screen(0)
-                except (KeyError, ValueError, SyntaxError, OverflowError):
+                    if os.path.isfile(f"{LOCAL_DIR_REPLAYS}{file}{REPLAY_FILE_FORMAT}"):
+                        replay_info = {"wbr_game_info": load_replay(f"{LOCAL_DIR_REPLAYS}{file}{REPLAY_FILE_FORMAT}")}
+                    else:
+                        replay_info = {"wbr_game_info": get_archive_game(file)}
+
+                    if replay_info['wbr_game_info'][0]['game_number'] > 0 and replay_info['wbr_game_info'][0]['board_length'] > 0:
+                        replay_info['timeline'] = Replay_Timeline(replay_info['wbr_game_info'])
+                        clear_screen(0)
+                        replay_menu(replay_info, get_replay_speed())
+                    else:
+                        clear_screen(0)
+                        print(Fore.WHITE + Style.BRIGHT + "Filename (Type 0 to go back to main menu): " + Fore.RED + Style.BRIGHT + "File not found or file extension not supported! Only .wbr (Word Battle Replay) files are supported.")
+                        print(Fore.WHITE + Style.BRIGHT + "Press any key to continue...")
+                        msvcrt.getch()
+                        clear_screen(0)
+                except (OSError, KeyError, IndexError, ValueError, SyntaxError, OverflowError, EOFError, struct.error, zlib.error, lzma.LZMAError):
                     clear_screen(0)
                     print(Fore.WHITE + Style.BRIGHT + "Filename (Type 0 to go back to main menu): " + Fore.RED + Style.BRIGHT + "File is corrupted or outdated and cannot be opened!")
                     print(Fore.WHITE + Style.BRIGHT + "Press any key to continue...")
@@ -282,112 +615,917 @@ def open_replay() -> None:
 
 
 class Custom_Agent:
-    """Create an agent object."""
-    # Write your custom agent program here
+    """Create an agent object. Write your custom agent program here, or in your own module as a class with the same choose_move method."""
+    def choose_move(self, observation: "Observation") -> Optional[Tuple[Tuple[Tuple[int, int], ...], str]]:
+        """Choose the path and the word to place on it, return None to resign. This one plays the first legal move, and resigns if there is none."""
+        for _, path, word in observation.generate_moves():
+            return path, word
+
+        return None
+
+class Observation:
+    """Create an observation object, a read-only view of the game for an custom agent. Nothing is copied, so it is only valid for the turn it was made for."""
+    def __init__(self, board: "Board", used_words: "Used_Words", player_name: str) -> None:
+        self.player_name = player_name # The name of the agent
+        self.board_length = board.length # The length of the board
+        self.turn_number = board.turn_counter # How many turns have been played
+        self.empty_cells = board.empty_cells # How many cells are empty
+        self.cells = board.cells.view() # The 2D array of the board as letter codes, an empty cell is EMPTY_CELL
+        self.cells.flags.writeable = False
+        self.path_empty = board.path_empty.view() # How many cells are empty on each path of the path table
+        self.path_empty.flags.writeable = False
+        self.path_table = get_path_table(board.length) # The starting positions and paths of the board length
+        self.used_words = Used_Words_View(used_words) # The words that have been used
+        self.lexicon = game_word_list # The words that can be placed
+        self.vocabularies = {"EASY": vocab_1, "MEDIUM": vocab_2, "HARD": game_word_list} # The vocabularies of the official agents
+        self._board = board # The board being viewed, only used to generate moves
+        self._used_words = used_words # The used words being viewed
+
+    def get_letter(self, coord: Tuple[int, int]) -> str:
+        """Get the letter of a cell, an empty cell is a space."""
+        return chr(self.cells[coord])
+
+    def get_pattern(self, path: Tuple[Tuple[int, int], ...]) -> str:
+        """Get the letters on the path, an empty cell is a ".", as used by Lexicon.find_words."""
+        return bytes([self.cells[coord] for coord in path]).decode('ascii').replace(" ", ".")
+
+    def get_valid_paths(self) -> List[Tuple[Tuple[int, int], ...]]:
+        """Get every path that can be selected, those with at least one empty cell."""
+        full_paths = self.path_empty == 0
+        return [path for coord in self.path_table.starting_positions for path in self.path_table.get_valid_paths(coord, full_paths)]
+
+    def generate_moves(self, lexicon=None, order=None) -> Generator[Tuple[Tuple[int, int], Tuple[Tuple[int, int], ...], str], Any, None]:
+        """Generate the legal (starting position, path, word) moves with the words of the lexicon, the game word list if none is given. See Board.generate_moves for the orders."""
+        return self._board.generate_moves(lexicon or self.lexicon, self._used_words, order)
+
+class Lexicon(Mapping):
+    """Create an lexicon object, the words categorised by length with an positional letter index."""
+    def __init__(self, letters: Dict[int, np.ndarray]) -> None:
+        self.letters = letters # The (words, length) array of letter codes for each length, the row number is the word ID
+        self.words = {} # The word list for each length, decoded when first needed
+        self.length_index = {} # The bitset of every word ID for each length
+        self.letter_index = {} # The bitset of word IDs for each (length, position, letter)
+        self.word_ids = {} # The word ID of each word for each length, built when first needed
+        self.columns = {} # The (length, words) array of letter codes for each length, one row per position so a position is compared in one go
+        self.id_offsets = dict(zip(sorted(letters), it.accumulate([len(letters[length]) for length in sorted(letters)], initial=0))) # Where the IDs of each length start when numbered across every length
+        self.pattern_cache = Pattern_Cache() # The words of the patterns found most recently, kept as long as the lexicon is loaded
+        self.strength_cache = Pattern_Cache() # The same words with their strength, strongest first
+        self.source = None # The word list the lexicon was loaded from
+        self.sha1 = None # The SHA-1 of that word list
+
+    def __getitem__(self, length: int) -> List[str]:
+        if length not in self.words:
+            self.words[length] = self.letters[length].view(f'S{length}').ravel().astype(f'U{length}').tolist()
+
+        return self.words[length]
+
+    def __iter__(self) -> Generator[int, Any, None]:
+        return iter(self.letters)
+
+    def __len__(self) -> int:
+        return len(self.letters)
+
+    @classmethod
+    def from_words(cls, words_categorised: Dict[int, List[str]]) -> "Lexicon":
+        """Create an lexicon from the categorised words. Words that are not plain ASCII cannot be stored as fixed-width letters and are left out."""
+        letters = {}
+
+        for length, words in words_categorised.items():
+            words = [word for word in words if word.isascii()]
+
+            if length > 0 and words:
+                letters[length] = np.frombuffer(''.join(words).encode('ascii'), dtype=np.uint8).reshape(len(words), length)
+
+        return cls(letters)
 
-class Board:
-    """Create an board object."""
-    def __init__(self) -> None:
-        self.length = None # The length of the board
-        self.matrix = None # The 2D array of the board
-        self.colour_map = None # The colours for each cell
-        self.starting_position = None # The current starting position
-        self.paths = None # A collection of paths
-        self.paths_full = None # A collection of full paths
-        self.selected_path = None # The current selected path
-        self.players = None # The current player list
-        self.player = None # The current player
-        self.previous_player = None # the previous player in the previous turn
-        self.previous_selected_path = None # the previous path selected by the player
-        self.word = None # The current player's word
-        self.used_words = None # Record every words used
-        self.winner = None # The winner of the current game
-        self.draw = False # Draw state
-        self.game_counter = 0 # Game counter for each game
-        self.turn_counter = 0 # Game counter for each game
-        self.game_duration = 0 # Game Duration of the whole game
+    @staticmethod
+    def pack_bits(mask: np.ndarray) -> int:
+        """Pack a boolean mask into a bitset, bit n is set if word ID n is in the mask."""
+        return int.from_bytes(np.packbits(mask, bitorder='little').tobytes(), 'little')
 
-    def create_board(self, length: int) -> None:
-        """Create the game board."""
-        self.length = length
-        self.matrix = np.full((self.length, self.length), " ", dtype='U1')
-        self.colour_map = self.set_colour_map()
+    @staticmethod
+    def unpack_bits(bits: int, size: int) -> np.ndarray:
+        """Unpack a bitset into the word IDs it contains in ascending order."""
+        mask = np.unpackbits(np.frombuffer(bits.to_bytes((size + 7) // 8, 'little'), dtype=np.uint8), bitorder='little')
+        return np.flatnonzero(mask[:size])
 
-    def set_colour_map(self) -> Dict[Tuple[Any], Any]:
-        """Ini the colours for the board."""
-        cells = [coord for coord in it.product(*[range(r[0], r[1]) for r in zip([0, 0], [self.length, self.length])])]
-        colour = ["WHITE"] * self.length ** 2
-        return dict(zip(cells, colour))
+    def index_words(self, length: int) -> None:
+        """Build the bitsets of every letter at every position for the words of one length."""
+        letters = self.letters[length]
+        self.length_index[length] = (1 << len(letters)) - 1
 
-    def check_draw(self) -> None:
-        """Check for a draw."""
-        if " " not in self.matrix:
-            self.draw = True
+        for position in range(length):
+            column = letters[:, position]
 
-    def get_starting_position(self) -> int:
-        """Get the starting position of the player."""
-        self.display_game_title()
-        self.display_board()
-        self.check_draw()
+            for code in np.unique(column):
+                self.letter_index[(length, position, chr(code))] = self.pack_bits(column == code)
 
-        if self.draw:
-            return 2
+    def find_words(self, pattern: str) -> List[str]:
+        """Find the words matching the pattern, a "." matches any letter. The words are in the same order as the word list and must not be changed."""
+        words = self.pattern_cache.get(pattern)
 
-        try:
-            # Split the input to get the coordinates
-            user_input = [int(n) for n in input(Fore.WHITE + Style.BRIGHT + "Starting Position: ").split(" ")]
+        if words is None:
+            words = self.match_words(pattern)
+            self.pattern_cache.add(pattern, words)
 
-            if len(user_input) == 1:
-                if 0 not in user_input:
-                    clear_screen(0)
-                    self.display_game_title()
-                    self.display_board()
-                    print(Fore.WHITE + Style.BRIGHT + "Starting Position: " + Fore.RED + Style.BRIGHT + "Invalid coordinates!")
-                    clear_screen()
-                    return self.get_starting_position()
-                else:
-                    return 0
+        return words
+
+    def find_strong_words(self, pattern: str) -> List[Tuple[int, str]]:
+        """Find the words matching the pattern as (minus strength, word), strongest first."""
+        words = self.strength_cache.get(pattern)
+
+        if words is None:
+            words = sorted((-Official_Agent.calculate_word_strength(word), word) for word in self.find_words(pattern))
+            self.strength_cache.add(pattern, words)
+
+        return words
+
+    def find_words_batch(self, patterns: List[str]) -> List[List[str]]:
+        """Find the words matching each pattern. The patterns that are not cached are matched in one go with the mask backend, or one at a time with the bitset backend."""
+        found = [self.pattern_cache.get(pattern) for pattern in patterns]
+        missing = [n for n, words in enumerate(found) if words is None]
+
+        if missing:
+            if LEXICON_BACKEND == "mask":
+                matched = self.match_words_batch([patterns[n] for n in missing])
             else:
-                if 0 in user_input:
-                    clear_screen(0)
-                    self.display_game_title()
-                    self.display_board()
-                    print(Fore.WHITE + Style.BRIGHT + "Starting Position: " + Fore.RED + Style.BRIGHT + "Invalid coordinates!")
-                    clear_screen()
-                    return self.get_starting_position()
-                else:
-                    if 0 < user_input[0] <= self.length and 0 < user_input[1] <= self.length:
-                        if user_input[0] == 1 and user_input[1] == user_input[0] or user_input[0] == 1 and user_input[1] > user_input[0] or user_input[1] == 1 and user_input[1] < user_input[0] or user_input[0] == self.length and user_input[1] == user_input[0] or user_input[0] == self.length and user_input[0] > user_input[1] or user_input[1] == self.length and user_input[1] > user_input[0]:
-                            self.starting_position = tuple([n - 1 for n in user_input])
-                            return 1
-                        else:
-                            clear_screen(0)
-                            self.display_game_title()
-                            self.display_board()
-                            print(Fore.WHITE + Style.BRIGHT + "Starting Position: " + Fore.RED + Style.BRIGHT + "Invalid coordinates!")
-                            clear_screen()
-                            return self.get_starting_position()
+                matched = [self.match_words(patterns[n]) for n in missing]
+
+            for n, words in zip(missing, matched):
+                self.pattern_cache.add(patterns[n], words)
+                found[n] = words
+
+        return found
+
+    def match_words(self, pattern: str) -> List[str]:
+        """Match the pattern against the word list with the selected backend."""
+        if LEXICON_BACKEND == "mask":
+            return self.match_words_batch([pattern])[0]
+
+        length = len(pattern)
+
+        if length not in self.letters:
+            return []
+        elif length not in self.length_index:
+            self.index_words(length)
+
+        bits = self.length_index[length]
+
+        # Intersect the bitsets of the letters already placed
+        for position, letter in enumerate(pattern):
+            if letter != ".":
+                bits &= self.letter_index.get((length, position, letter), 0)
+
+                if not bits:
+                    return []
+
+        if bits == self.length_index[length]:
+            return self[length]
+
+        words = self[length]
+        return [words[word_id] for word_id in self.unpack_bits(bits, len(words))]
+
+    def match_words_batch(self, patterns: List[str]) -> List[List[str]]:
+        """Match each pattern by comparing the letter arrays. The first letter on a pattern is compared with every word, once for all the patterns
+        with the same letter there, and each other letter only with the words still left."""
+        found = []
+        first_matches = {} # The IDs of the words with each (length, position, letter) the patterns start from
+
+        for pattern in patterns:
+            length = len(pattern)
+            letters = [(position, ord(letter)) for position, letter in enumerate(pattern) if letter != "."]
+
+            if length not in self.letters:
+                found.append([])
+                continue
+            elif not letters:
+                found.append(self[length])
+                continue
+            elif length not in self.columns:
+                self.columns[length] = np.ascontiguousarray(self.letters[length].T)
+
+            columns = self.columns[length]
+            key = (length, *letters[0])
+
+            if key not in first_matches:
+                first_matches[key] = np.flatnonzero(columns[letters[0][0]] == letters[0][1])
+
+            word_ids = first_matches[key]
+
+            for position, code in letters[1:]:
+                word_ids = word_ids[columns[position][word_ids] == code]
+
+            # Decode the words left in one go rather than one at a time
+            found.append(self.letters[length][word_ids].view(f'S{length}').ravel().astype(f'U{length}').tolist())
+
+        return found
+
+    def get_word_id(self, word: str) -> Optional[int]:
+        """Get the ID of the word numbered across every length, None if the word is not in the lexicon."""
+        length = len(word)
+
+        if length not in self.letters:
+            return None
+        elif length not in self.word_ids:
+            self.word_ids[length] = {text: word_id for word_id, text in enumerate(self[length])}
+
+        word_id = self.word_ids[length].get(word)
+        return None if word_id is None else self.id_offsets[length] + word_id
+
+    def is_word(self, word: str) -> bool:
+        """Check if the word is in the lexicon."""
+        return self.get_word_id(word) is not None
+
+    @staticmethod
+    def fits_pattern(word: str, pattern: str) -> bool:
+        """Check if the word can be placed over the pattern, a "." or a space matches any letter."""
+        return len(word) == len(pattern) and all(letter in ". " or letter == word_letter for word_letter, letter in zip(word, pattern))
+
+class Pattern_Cache:
+    """Create an pattern cache object, the words found for the most recently used patterns of an lexicon."""
+    def __init__(self, size=PATTERN_CACHE_SIZE) -> None:
+        self.size = size # The most patterns to remember
+        self.entries = OrderedDict() # The words found for each pattern, the least recently used first
+        self.hits = 0 # How many patterns were found in the cache
+        self.misses = 0 # How many patterns had to be matched
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, pattern: str) -> Optional[List[str]]:
+        """Get the words found for the pattern, None if it is not remembered."""
+        words = self.entries.get(pattern)
+
+        if words is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(pattern)
+
+        return words
+
+    def add(self, pattern: str, words: List[str]) -> None:
+        """Remember the words found for the pattern, forgetting the least recently used pattern if the cache is full."""
+        if self.size <= 0:
+            return
+
+        self.entries[pattern] = words
+
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forget every pattern and reset the counters."""
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+class Used_Words:
+    """Create an used words object, the words in the order they were used with constant time lookups."""
+    def __init__(self, lexicon=None, words=()) -> None:
+        self.lexicon = lexicon # The lexicon giving the word IDs, usually the game word list
+        self.order = [] # The words in the order they were used
+        self.keys = set() # The word ID of each used word, or the word itself if it is not in the lexicon
+        self.hash = 0 # The Zobrist hash of the used words, whatever order they were used in
+
+        for word in words:
+            self.append(word)
+
+    def __contains__(self, word: str) -> bool:
+        return self.get_key(word) in self.keys
+
+    def __iter__(self) -> Generator[str, Any, None]:
+        return iter(self.order)
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def __repr__(self) -> str:
+        return repr(self.order)
+
+    def get_key(self, word: str) -> Union[int, str]:
+        """Get the key the word is stored by."""
+        word_id = self.lexicon.get_word_id(word) if self.lexicon else None
+        return word if word_id is None else word_id
+
+    def append(self, word: str) -> None:
+        """Add an used word."""
+        self.order.append(word)
+        self.keys.add(self.get_key(word))
+        self.hash ^= get_word_key(word)
+
+    def pop(self) -> str:
+        """Remove the last used word."""
+        word = self.order.pop()
+        self.keys.discard(self.get_key(word)) # A word can only be used once in a game
+        self.hash ^= get_word_key(word)
+        return word
+
+    def checkpoint(self) -> int:
+        """Mark the current used words so they can be rolled back to."""
+        return len(self.order)
+
+    def rollback(self, checkpoint: int) -> None:
+        """Remove every word used after the checkpoint."""
+        while len(self.order) > checkpoint:
+            self.pop()
+
+    def copy(self) -> "Used_Words":
+        """Create a copy of the used words."""
+        used_words = Used_Words(self.lexicon)
+        used_words.order = self.order.copy()
+        used_words.keys = self.keys.copy()
+        used_words.hash = self.hash
+        return used_words
+
+class Used_Words_View(Set):
+    """Create an used words view object, a read-only view of the used words that is never copied."""
+    def __init__(self, used_words: Used_Words) -> None:
+        self._used_words = used_words # The used words being viewed
+
+    def __contains__(self, word: str) -> bool:
+        return word in self._used_words
+
+    def __iter__(self) -> Generator[str, Any, None]:
+        return iter(self._used_words)
+
+    def __len__(self) -> int:
+        return len(self._used_words)
+
+class Transposition_Table:
+    """Create an transposition table object, the rollout outcomes of positions keyed by their hash, the least recently used are forgotten first."""
+    def __init__(self, size=TRANSPOSITION_TABLE_SIZE) -> None:
+        self.size = size # The most positions to remember
+        self.entries = OrderedDict() # The [rollouts, sum of the outcomes, solved] of each position, for the player to move
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: int) -> Optional[List[Any]]:
+        """Get the entry of a position, None if it is not remembered."""
+        entry = self.entries.get(key)
+
+        if entry is not None:
+            self.entries.move_to_end(key)
+
+        return entry
+
+    def add(self, key: int, entry: List[Any]) -> None:
+        """Remember the entry of a position, forgetting the least recently used position if the table is full."""
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def record(self, key: int, outcome: float) -> None:
+        """Add the outcome of a rollout through a position, a solved position keeps its outcome."""
+        entry = self.get(key)
+
+        if entry is None:
+            self.add(key, [1, outcome, False])
+        elif not entry[2]:
+            entry[0] += 1
+            entry[1] += outcome
+
+    def solve(self, key: int, outcome: int) -> None:
+        """Remember the exact outcome of a position."""
+        self.add(key, [1, outcome, True])
+
+class Replay_Writer:
+    """Create an replay writer object, which writes a game in the binary replay format one event at a time."""
+    def __init__(self, file: BinaryIO, game_number: int, board_length: int, players: List[Tuple[str, str, Optional[str]]], compression=REPLAY_COMPRESSION) -> None:
+        self.file = file # The file to write to, opened in binary mode
+        self.board_length = board_length # The length of the board
+        self.players = list(players) # The (name, type, difficulty) of each player, the events refer to them by index
+        self.header_position = file.tell() # Where the header starts, the game duration is filled in when the writer is closed
+        self.compressor = None # Compress the events as they are written
+
+        if compression == "zlib":
+            self.compressor = zlib.compressobj(9)
+        elif compression == "lzma":
+            self.compressor = lzma.LZMACompressor()
+
+        # Header: magic, compression, game number, board length, game duration and the player table
+        self.file.write(struct.pack('<4sBIB8s', REPLAY_FILE_MAGIC, REPLAY_COMPRESSIONS.index(compression), game_number, board_length, b"00:00:00"))
+        self.file.write(struct.pack('<B', len(self.players)))
+
+        for name, player_type, difficulty in self.players:
+            self.write_string(name)
+            self.file.write(struct.pack('<B', player_type == "computer"))
+            self.write_string(difficulty or "")
+
+    def write_string(self, text: str) -> None:
+        """Write a string with its length in front. The length is one byte, so a longer string is cut after the last whole character that fits."""
+        data = text.encode('utf-8')[:255].decode('utf-8', 'ignore').encode('utf-8')
+        self.file.write(struct.pack('<B', len(data)) + data)
+
+    def write_body(self, data: bytes) -> None:
+        """Write event data, compressed if the replay is compressed."""
+        if self.compressor is not None:
+            data = self.compressor.compress(data)
+
+        self.file.write(data)
+
+    def write_event(self, event: Dict[str, Any]) -> None:
+        """Write one event. An placed word is stored as its starting position, the path number from there and the letters."""
+        player = self.players.index((event['player_name'], event['type'], event['difficulty']))
+        record = struct.pack('<BB', REPLAY_EVENTS.index(event['event']), player)
+
+        if event['event'] == "PLAYING":
+            path = tuple(tuple(coord) for coord in event['selected_path'])
+            record += struct.pack('<BBB', *path[0], get_start_paths(self.board_length, path[0]).index(path)) + event['word'].encode('ascii')
+
+        self.write_body(record)
+
+    def close(self, game_duration: str) -> None:
+        """Write the end of the events and fill in the game duration."""
+        self.write_body(struct.pack('<BB', REPLAY_EVENTS.index("END"), 0))
+
+        if self.compressor is not None:
+            self.file.write(self.compressor.flush())
+
+        end_position = self.file.tell()
+        self.file.seek(self.header_position + 10)
+        self.file.write(struct.pack('<8s', game_duration.encode('ascii')))
+        self.file.seek(end_position)
+
+class Replay_Reader:
+    """Create an replay reader object, which reads a game in the binary replay format one event at a time."""
+    def __init__(self, file: BinaryIO) -> None:
+        self.file = file # The file to read from, opened in binary mode
+        self.buffer = bytearray() # Event data read but not parsed yet
+        self.decompressor = None # Decompress the events as they are read
+        self.players = [] # The (name, type, difficulty) of each player
+
+        magic, compression, game_number, board_length, game_duration = struct.unpack('<4sBIB8s', self.file.read(18))
+
+        if magic != REPLAY_FILE_MAGIC or compression >= len(REPLAY_COMPRESSIONS):
+            raise ValueError("Not an binary replay file")
+
+        self.game_info = {"game_number": game_number, "board_length": board_length, "game_duration": game_duration.decode('ascii')} # The same game info as the first item of Game.replay_info
+
+        for _ in range(struct.unpack('<B', self.file.read(1))[0]):
+            name = self.read_string()
+            player_type = "computer" if struct.unpack('<B', self.file.read(1))[0] else "human"
+            self.players.append((name, player_type, self.read_string() or None))
+
+        if REPLAY_COMPRESSIONS[compression] == "zlib":
+            self.decompressor = zlib.decompressobj()
+        elif REPLAY_COMPRESSIONS[compression] == "lzma":
+            self.decompressor = lzma.LZMADecompressor()
+
+    def read_string(self) -> str:
+        """Read a string with its length in front."""
+        return self.file.read(struct.unpack('<B', self.file.read(1))[0]).decode('utf-8')
+
+    def read_body(self, size: int) -> bytes:
+        """Read event data, decompressing more of the file when needed."""
+        while len(self.buffer) < size:
+            chunk = self.file.read(REPLAY_CHUNK_SIZE)
+
+            if not chunk:
+                raise EOFError("Replay file ended before its last event")
+            elif self.decompressor is not None:
+                chunk = self.decompressor.decompress(chunk)
+
+            self.buffer += chunk
+
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return data
+
+    def events(self) -> Generator[Dict[str, Any], Any, None]:
+        """Read the events in the same form as Game.replay_info."""
+        while True:
+            event_type, player = self.read_body(2)
+
+            if REPLAY_EVENTS[event_type] == "END":
+                return
+
+            name, player_type, difficulty = self.players[player]
+            event = {"player_name": name, "type": player_type, "difficulty": difficulty, "event": REPLAY_EVENTS[event_type], "selected_path": None, "word": None}
+
+            if event['event'] == "PLAYING":
+                row, column, path_number = self.read_body(3)
+                path = get_start_paths(self.game_info['board_length'], (row, column))[path_number]
+                event['selected_path'] = list(path)
+                event['word'] = self.read_body(len(path)).decode('ascii')
+
+            yield event
+
+class Replay_Archive:
+    """Create an replay archive object, which appends every game of a simulation run to one file and indexes where each game starts."""
+    def __init__(self, name: str, folder=LOCAL_DIR_REPLAYS) -> None:
+        self.archive_file = f"{folder}{name}{REPLAY_ARCHIVE_FORMAT}" # The games, one binary replay after another
+        self.index_file = f"{folder}{name}{REPLAY_INDEX_FORMAT}" # The player table followed by one fixed-size record per game
+        self.players = None # The (name, type, difficulty) of each player
+        self.index_start = 0 # Where the first index record starts
+
+    def __len__(self) -> int:
+        return (os.path.getsize(self.index_file) - self.index_start) // REPLAY_INDEX_RECORD.size
+
+    def open(self, players=None) -> None:
+        """Open the archive. An archive that does not exist yet is created for the players, an existing one must belong to them."""
+        if os.path.isfile(self.index_file):
+            with open(self.index_file, 'rb') as f:
+                if f.read(len(REPLAY_INDEX_MAGIC)) != REPLAY_INDEX_MAGIC:
+                    raise ValueError("Not an replay archive index")
+
+                header_size = struct.unpack('<I', f.read(4))[0]
+                self.players = [tuple(player) for player in json.loads(f.read(header_size))]
+                self.index_start = len(REPLAY_INDEX_MAGIC) + 4 + header_size
+
+            if players is not None and [tuple(player) for player in players] != self.players:
+                raise ValueError(f"{self.archive_file} holds games of other players")
+        elif players is None:
+            raise FileNotFoundError(errno.ENOENT, "Replay archive not found", self.index_file)
+        else:
+            # Create the folder if it does not exist
+            try:
+                os.makedirs('Replays')
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+
+            self.players = [tuple(player) for player in players]
+            header = json.dumps(self.players).encode('utf-8')
+            self.index_start = len(REPLAY_INDEX_MAGIC) + 4 + len(header)
+            open(self.archive_file, 'wb').close()
+
+            with open(self.index_file, 'wb') as f:
+                f.write(REPLAY_INDEX_MAGIC + struct.pack('<I', len(header)) + header)
+
+    def append(self, replay: bytes, game_record: Dict[str, Any]) -> None:
+        """Append an encoded game to the archive and its record to the index."""
+        with open(self.archive_file, 'ab') as f:
+            offset = f.seek(0, os.SEEK_END)
+            f.write(replay)
+
+        winner = -1 if game_record['winner_index'] is None else game_record['winner_index']
+
+        with open(self.index_file, 'ab') as f:
+            f.write(REPLAY_INDEX_RECORD.pack(offset, len(replay), game_record['game_number'], game_record['turns'], game_record['board_length'], winner))
+
+    def get_game_info(self, n: int) -> Dict[str, Any]:
+        """Get the index record of the nth game in the archive, counting from 1."""
+        if not 1 <= n <= len(self):
+            raise IndexError(f"Game {n} is not in the archive")
+
+        with open(self.index_file, 'rb') as f:
+            f.seek(self.index_start + (n - 1) * REPLAY_INDEX_RECORD.size)
+            offset, size, game_number, turns, board_length, winner = REPLAY_INDEX_RECORD.unpack(f.read(REPLAY_INDEX_RECORD.size))
+
+        return {"offset": offset, "size": size, "game_number": game_number, "turns": turns, "board_length": board_length, "players": self.players, "winner": None if winner < 0 else self.players[winner]}
+
+    def get_games(self) -> Generator[Tuple[int, int], Any, None]:
+        """Get where each game of the archive starts and its size, reading the index one chunk at a time."""
+        chunk_size = REPLAY_CHUNK_SIZE - REPLAY_CHUNK_SIZE % REPLAY_INDEX_RECORD.size
+
+        with open(self.index_file, 'rb') as f:
+            f.seek(self.index_start)
+
+            while True:
+                data = f.read(chunk_size)
+
+                # A record still being appended is left out
+                for offset, size, *_ in REPLAY_INDEX_RECORD.iter_unpack(data[:len(data) - len(data) % REPLAY_INDEX_RECORD.size]):
+                    yield offset, size
+
+                if len(data) < chunk_size:
+                    return
+
+    def load_game(self, n: int) -> List[Dict[str, Any]]:
+        """Load the game info and every event of the nth game in the archive without reading the games before it."""
+        game_info = self.get_game_info(n)
+
+        with open(self.archive_file, 'rb') as f:
+            f.seek(game_info['offset'])
+            reader = Replay_Reader(io.BytesIO(f.read(game_info['size'])))
+
+        return [reader.game_info] + list(reader.events())
+
+class Replay_Timeline:
+    """Create an replay timeline object, which puts a board in the position after any event of a game.
+    The board is kept every REPLAY_KEYFRAME_INTERVAL events as a keyframe, so an event is reached from the keyframe before it rather than from the start."""
+    def __init__(self, replay_info: List[Dict[str, Any]]) -> None:
+        self.game_info = replay_info[0] # The game number, board length and game duration
+        self.events = replay_info[1:] # The events of the game
+        self.keyframes = [] # The board and the game title after every REPLAY_KEYFRAME_INTERVAL events
+        self.turn_events = [0] # How many events have been played by the end of each turn
+        self.turns = 0 # How many words were placed
+        board = self.create_board()
+        title = board.get_game_title()
+
+        for frame in range(len(self.events) + 1):
+            if frame > 0:
+                title = self.play_event(board, self.events[frame - 1])
+
+                if self.events[frame - 1]['event'] == "PLAYING":
+                    self.turn_events.append(frame)
+
+            if frame % REPLAY_KEYFRAME_INTERVAL == 0:
+                self.keyframes.append((board.copy(), title))
+
+        self.turns = len(self.turn_events) - 1
+
+    def create_board(self) -> "Board":
+        """Create the board of the game before its first event."""
+        board = Board()
+        board.create_board(self.game_info['board_length'])
+        board.game_duration = self.game_info['game_duration']
+        board.game_counter = self.game_info['game_number']
+        players = []
+
+        for player in self.events:
+            if player['player_name'] not in players:
+                players.append({"name": player['player_name'], "type": player['type'], "difficulty": player['difficulty']})
+
+        board.players = [dict(t) for t in {tuple(d.items()) for d in players}]
+
+        # A game without events has no player to move, it is only the empty board
+        if not players:
+            return board
+
+        board.player = players[0]['name']
+
+        if players[0]['difficulty'] is not None:
+            board.player = f"{players[0]['name']} ({players[0]['difficulty']})"
+
+        return board
+
+    @staticmethod
+    def play_event(board: "Board", player: Dict[str, Any]) -> List[str]:
+        """Play an event on the board, return the game title after it."""
+        event = player['event']
+        player_name = player['player_name']
+        board.player = player_name
+
+        if player['type'] == "computer":
+            player_name = f"{player['player_name']} ({player['difficulty']})"
+
+        if event == 'RESIGNED':
+            return board.get_game_title(False, False, True)
+        elif event == 'WON':
+            board.winner = player_name
+            return board.get_game_title(False, True)
+        elif event == 'PLAYING':
+            board.turn_counter += 1
+            board.selected_path = [tuple(i) for i in player['selected_path']]
+            board.place_word(player['word'])
+            board.previous_player = player_name
+            return board.get_game_title()
+        elif event == 'DRAW':
+            board.draw = True
+            return board.get_game_title(True)
+
+        return board.get_game_title()
+
+    def seek(self, frame: int) -> Tuple["Board", List[str]]:
+        """Get a board in the position after the first frame events and its game title.
+        The keyframe boards all share one renderer, so a board from here is drawn in place of the last one."""
+        keyframe, title = self.keyframes[frame // REPLAY_KEYFRAME_INTERVAL]
+        board = keyframe.copy()
+
+        for event in self.events[frame - frame % REPLAY_KEYFRAME_INTERVAL:frame]:
+            title = self.play_event(board, event)
+
+        return board, title
+
+    def get_turn_event(self, turn: int) -> int:
+        """Get how many events have been played by the end of a turn."""
+        return self.turn_events[turn]
+
+class Replay_Stats:
+    """Create an replay stats object, the statistics of many games gathered one event at a time. The stats of each worker are merged into one."""
+    def __init__(self) -> None:
+        self.games = 0 # How many games were read
+        self.seats = {} # The games, wins and draws of each seat, keyed by how many players there were and the seat counting from 1
+        self.board_lengths = {} # The games, draws, turns and the shortest and longest game of each board length
+        self.players = {} # The games, wins and draws of each player
+        self.decisive_words = Counter() # How often each word was the last one placed before a player resigned
+        self.skipped = [] # The replays that could not be read and why
+
+    def add_game(self, game_info: Dict[str, Any], events: Iterator[Dict[str, Any]]) -> None:
+        """Add a game, its events are read one at a time. Nothing is added if reading them fails part way."""
+        seats = [] # The players in the order they first moved
+        turns = 0
+        winner = None
+        draw = False
+        last_word = None
+        decisive_words = []
+
+        for event in events:
+            player_name = event['player_name'] if event['difficulty'] is None else f"{event['player_name']} ({event['difficulty']})"
+
+            if player_name not in seats:
+                seats.append(player_name)
+
+            if event['event'] == "PLAYING":
+                turns += 1
+                last_word = event['word']
+            elif event['event'] == "RESIGNED" and last_word is not None:
+                decisive_words.append(last_word)
+            elif event['event'] == "WON":
+                winner = player_name
+            elif event['event'] == "DRAW":
+                draw = True
+
+        self.games += 1
+        board_length = self.board_lengths.setdefault(game_info['board_length'], {"games": 0, "draws": 0, "turns": 0, "shortest": turns, "longest": turns})
+        board_length['games'] += 1
+        board_length['draws'] += draw
+        board_length['turns'] += turns
+        board_length['shortest'] = min(board_length['shortest'], turns)
+        board_length['longest'] = max(board_length['longest'], turns)
+
+        for seat, player_name in enumerate(seats, 1):
+            for stats in (self.seats.setdefault((len(seats), seat), {"games": 0, "wins": 0, "draws": 0}), self.players.setdefault(player_name, {"games": 0, "wins": 0, "draws": 0})):
+                stats['games'] += 1
+                stats['wins'] += player_name == winner
+                stats['draws'] += draw
+
+        self.decisive_words.update(decisive_words)
+
+    def merge(self, other: "Replay_Stats") -> None:
+        """Add the stats gathered by another worker."""
+        self.games += other.games
+
+        for table, other_table in ((self.seats, other.seats), (self.board_lengths, other.board_lengths), (self.players, other.players)):
+            for key, other_stats in other_table.items():
+                if key not in table:
+                    table[key] = dict(other_stats)
+                    continue
+
+                for stat, value in other_stats.items():
+                    if stat == "shortest":
+                        table[key][stat] = min(table[key][stat], value)
+                    elif stat == "longest":
+                        table[key][stat] = max(table[key][stat], value)
                     else:
-                        clear_screen(0)
-                        self.display_game_title()
-                        self.display_board()
-                        print(Fore.WHITE + Style.BRIGHT + "Starting Position: " + Fore.RED + Style.BRIGHT + "Invalid coordinates!")
-                        clear_screen()
-                        return self.get_starting_position()
-        except (IndexError, ValueError):
-            clear_screen(0)
-            self.display_game_title()
-            self.display_board()
-            print(Fore.WHITE + Style.BRIGHT + "Starting Position: " + Fore.RED + Style.BRIGHT + "Invalid coordinates!")
-            clear_screen()
-            return self.get_starting_position()
+                        table[key][stat] += value
+
+        self.decisive_words.update(other.decisive_words)
+        self.skipped += other.skipped
+
+    def get_tables(self, top=ANALYSIS_TOP_WORDS) -> Dict[str, List[Dict[str, Any]]]:
+        """Get the stats as tables, each is a list of rows with the same columns."""
+        return {
+            "seats": [{"players": players, "seat": seat, **stats, "win_rate": round(stats['wins'] / stats['games'], 3)} for (players, seat), stats in sorted(self.seats.items())],
+            "board_lengths": [{"board_length": board_length, "games": stats['games'], "draws": stats['draws'], "average_turns": round(stats['turns'] / stats['games'], 2), "shortest": stats['shortest'], "longest": stats['longest']} for board_length, stats in sorted(self.board_lengths.items())],
+            "players": [{"player": player_name, **stats, "win_rate": round(stats['wins'] / stats['games'], 3)} for player_name, stats in sorted(self.players.items())],
+            "decisive_words": [{"word": word, "games": games} for word, games in sorted(self.decisive_words.items(), key=lambda item: (-item[1], item[0]))[:top]]
+        }
+
+class Opening_Book:
+    """Create an opening book object, the moves worked out ahead of time for the first positions of each board length and vocabulary."""
+    def __init__(self) -> None:
+        self.vocabularies = {} # The SHA-1 of each word list the book has moves for, a move is only played if the word list has not changed
+        self.moves = {} # The (word, path) of each (board length, word list, position hash)
 
-    def create_valid_paths(self) -> None:
-        """Generate paths based on the starting position. Check the list for paths that are full. Remove them if they are."""
-        # Convert the coordinates of the starting position to zero-based numbering
-        x = self.starting_position[0]
-        y = self.starting_position[1]
+    def __len__(self) -> int:
+        return len(self.moves)
+
+    @classmethod
+    def load(cls, book_file: str) -> "Opening_Book":
+        """Read an opening book file, an empty book if there is no valid file."""
+        book = cls()
+
+        try:
+            with open(book_file, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return book
+
+        try:
+            if not data.startswith(BOOK_FILE_MAGIC):
+                raise ValueError("Not an opening book file")
+
+            offset = len(BOOK_FILE_MAGIC)
+            header_size = struct.unpack_from('<I', data, offset)[0]
+            offset += 4
+            book.vocabularies = json.loads(data[offset:offset + header_size])
+            offset += header_size
+            sources = list(book.vocabularies)
+
+            while offset < len(data):
+                position, board_length, vocabulary, starting_position, path_number, word_length = BOOK_RECORD.unpack_from(data, offset)
+                offset += BOOK_RECORD.size
+                word = data[offset:offset + word_length].decode('ascii')
+                offset += word_length
+                path_table = get_path_table(board_length)
+                path = path_table.paths[path_table.starting_positions[starting_position]][path_number]
+                book.moves[(board_length, sources[vocabulary], position)] = (word, path)
+        except (ValueError, IndexError, KeyError, struct.error):
+            return cls()
+
+        return book
+
+    def save(self, book_file: str) -> None:
+        """Write the opening book file."""
+        sources = list(self.vocabularies)
+        header = json.dumps(self.vocabularies).encode('utf-8')
+
+        # Create the folder if it does not exist
+        try:
+            os.makedirs(os.path.dirname(book_file))
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+
+        with open(f"{book_file}.tmp", 'wb') as f:
+            f.write(BOOK_FILE_MAGIC)
+            f.write(struct.pack('<I', len(header)))
+            f.write(header)
+
+            for (board_length, source, position), (word, path) in sorted(self.moves.items()):
+                path_table = get_path_table(board_length)
+                starting_position = path_table.starting_positions.index(path[0])
+                f.write(BOOK_RECORD.pack(position, board_length, sources.index(source), starting_position, path_table.paths[path[0]].index(path), len(word)))
+                f.write(word.encode('ascii'))
+
+        os.replace(f"{book_file}.tmp", book_file)
+
+    def add(self, board: "Board", vocabulary: Lexicon, move: Tuple[str, Tuple[Tuple[int, int], ...]]) -> None:
+        """Add the move for the position on the board, the moves for an older version of the word list are dropped."""
+        if self.vocabularies.get(vocabulary.source) != vocabulary.sha1:
+            self.moves = {key: value for key, value in self.moves.items() if key[1] != vocabulary.source}
+            self.vocabularies[vocabulary.source] = vocabulary.sha1
+
+        self.moves[(board.length, vocabulary.source, board.position_hash)] = move
+
+    def get_move(self, board: "Board", vocabulary: Lexicon) -> Optional[Tuple[str, Tuple[Tuple[int, int], ...]]]:
+        """Get the move for the position on the board, None if the book has no move for it or the move cannot be played."""
+        if self.vocabularies.get(vocabulary.source) != vocabulary.sha1:
+            return None
+
+        move = self.moves.get((board.length, vocabulary.source, board.position_hash))
 
+        if move is None:
+            return None
+
+        word, path = move
+        pattern = ''.join(board.get_letter(coord) for coord in path)
+
+        # The position hash could collide, so make sure the move is still legal
+        if " " not in pattern or not Lexicon.fits_pattern(word, pattern) or word in board.used_words:
+            return None
+
+        return move
+
+class Path_Table:
+    """Create an path table object, the starting positions and paths of a board length which never change during a game."""
+    def __init__(self, length: int) -> None:
+        self.length = length # The length of the board
+        self.starting_positions = [] # Every cell on the border, in the order the official agent considers them
+        self.paths = {} # The three paths from each starting position
+        self.first_row = {} # The row of the first path of each starting position in the index arrays
+        self.remaining_paths = [] # The path numbers kept for each combination of full paths, bit n is set if path n + 1 is full
+
+        for x in range(self.length):
+            for y in range(self.length):
+                if x == 0 and y == x or x == 0 and y > x or y == 0 and y < x or x == self.length - 1 and y == x or x == self.length - 1 and x > y or y == self.length - 1 and y > x:
+                    self.first_row[(x, y)] = len(self.starting_positions) * 3
+                    self.starting_positions.append((x, y))
+                    self.paths[(x, y)] = tuple(tuple(path) for path in self.make_paths(x, y))
+
+        # One row of flat cell indices per path, padded to the board length, and a mask of the cells that belong to the path
+        self.path_indices = np.zeros((len(self.starting_positions) * 3, self.length), dtype=np.intp)
+        self.path_mask = np.zeros((len(self.starting_positions) * 3, self.length), dtype=bool)
+
+        for coord in self.starting_positions:
+            for n, path in enumerate(self.paths[coord]):
+                self.path_indices[self.first_row[coord] + n, :len(path)] = [x * self.length + y for x, y in path]
+                self.path_mask[self.first_row[coord] + n, :len(path)] = True
+
+        # The rows of every path that passes through each cell, to update the empty cells of each path when a letter is placed
+        self.path_lengths = self.path_mask.sum(axis=1)
+        self.cell_paths = {}
+
+        for row in range(len(self.path_indices)):
+            for cell in self.path_indices[row, :self.path_lengths[row]]:
+                self.cell_paths.setdefault(divmod(int(cell), self.length), []).append(row)
+
+        self.cell_paths = {coord: np.array(rows, dtype=np.intp) for coord, rows in self.cell_paths.items()}
+
+        # Keep the same paths as removing the full ones from the list one by one
+        for full in range(8):
+            path_numbers = [0, 1, 2]
+
+            try:
+                if full & 1:
+                    path_numbers.pop(0)
+                if full & 2:
+                    path_numbers.pop(-2)
+                if full & 4:
+                    path_numbers.pop(1)
+            except IndexError:
+                path_numbers = []
+
+            self.remaining_paths.append(tuple(path_numbers))
+
+    def make_paths(self, x: int, y: int) -> List[List[Tuple[int, int]]]:
+        """Get the coordinates of the three paths from a starting position."""
         # Create a list of three paths
         path1 = []
         path2 = []
@@ -552,34 +1690,369 @@ class Board:
                 # Reverse any path that may needs be
                 path2.reverse()
 
-        self.paths = [path1, path2, path3]
-        self.paths_full = [path1, path2, path3]
-
-        # Create a list of strings for each path
-        path1_res = []
-        path2_res = []
-        path3_res = []
-
-        # Checking if the paths are full if they do not contain an empty string
-        for coord in self.paths[0]:
-            if " " in self.matrix[coord]:
-                path1_res.append(self.matrix[coord])
-        for coord in self.paths[1]:
-            if " " in self.matrix[coord]:
-                path2_res.append(self.matrix[coord])
-        for coord in self.paths[2]:
-            if " " in self.matrix[coord]:
-                path3_res.append(self.matrix[coord])
+        return [path1, path2, path3]
+
+    def get_valid_paths(self, starting_position: Tuple[int, int], full_paths: np.ndarray) -> List[Tuple[Tuple[int, int], ...]]:
+        """Get the paths that can be selected from a starting position, given which paths of the table are full."""
+        first_row = self.first_row[starting_position]
+        full = int(full_paths[first_row]) | int(full_paths[first_row + 1]) << 1 | int(full_paths[first_row + 2]) << 2
+        return [self.paths[starting_position][n] for n in self.remaining_paths[full]]
+
+class Board_Frame:
+    """Create an board frame object, the parts of a drawn board of a board length which never change."""
+    def __init__(self, length: int) -> None:
+        self.length = length # The length of the board
+        self.cells = tuple(it.product(range(length), repeat=2)) # Every cell of the board, row by row
+        self.column_labels = "   " + "".join(f"{n + 1:>4}" for n in range(length)) # The column numbers above and under the grid
+        self.top_border = "    ┌" + "┬".join(["───"] * length) + "┐" # The line above the first row
+        self.row_border = "    ├" + "┼".join(["───"] * length) + "┤" # The line between two rows
+        self.bottom_border = "    └" + "┴".join(["───"] * length) + "┘" # The line under the last row
+        self.row_labels = [f"{n + 1:>3} " for n in range(length)] # The row number left of each row
+        self.row_ends = [f"{Fore.WHITE}│ {n + 1}" for n in range(length)] # The last wall and the row number right of each row
+
+    def get_line_count(self) -> int:
+        """Get how many lines a drawn board takes."""
+        return 2 * self.length + 3
+
+    def get_cell_line(self, x: int) -> int:
+        """Get the line of a row, counted from the column labels."""
+        return 2 + 2 * x
+
+    def get_cell_column(self, y: int) -> int:
+        """Get the column of the letters of a column, counted from 1."""
+        return 4 * y + 7
+
+    def get_row(self, x: int, letters: List[str], colours: List[str]) -> str:
+        """Get the line of a row with the letter and colour of each cell."""
+        return Fore.WHITE + self.row_labels[x] + "".join(f"{Fore.WHITE}│{getattr(Fore, colour)} {letter} " for letter, colour in zip(letters, colours)) + self.row_ends[x]
+
+    def get_lines(self, letters: List[List[str]], colours: List[List[str]]) -> List[str]:
+        """Get every line of a drawn board."""
+        lines = [self.column_labels, self.top_border]
+
+        for x in range(self.length):
+            lines.append(self.get_row(x, letters[x], colours[x]))
+            lines.append(self.row_border if x < self.length - 1 else self.bottom_border)
+
+        lines.append(self.column_labels)
+        return lines
+
+class Board_Renderer:
+    """Create an board renderer object, it draws boards and the lines around them on the terminal.
+    When a screen it has drawn is drawn again, only the lines and cells that changed are written, by moving the cursor to them.
+    A renderer that does not render is a sink, so a board can be played or replayed without drawing anything."""
+    def __init__(self, render=True, stream=None, incremental=RENDER_INCREMENTAL) -> None:
+        self.render = render # Whether anything is drawn at all
+        self.stream = stream # Where the board is drawn, the standard output if None
+        self.incremental = incremental # Whether a screen is drawn again in place rather than cleared
+        self.header = None # The lines above the board on the screen, None if what is on the screen is not known
+        self.footer = None # The lines under the board on the screen
+        self.letters = None # The letter of each cell on the screen
+        self.colours = None # The colour of each cell on the screen
+
+    @staticmethod
+    def get_cells(board: np.ndarray, colour_map: Dict[Tuple[int, int], str]) -> Tuple[List[List[str]], List[List[str]]]:
+        """Get the letter and colour of each cell, row by row."""
+        length = len(board)
+        colours = [colour_map[coord] for coord in get_board_frame(length).cells]
+        return np.asarray(board).tolist(), [colours[x * length:(x + 1) * length] for x in range(length)]
+
+    def write(self, text: str) -> None:
+        """Write to the stream."""
+        stream = self.stream or sys.stdout
+        stream.write(text)
+        stream.flush()
+
+    def get_str_board(self, board: np.ndarray, colour_map: Dict[Tuple[int, int], str]) -> str:
+        """Get the drawing of a board as one string."""
+        letters, colours = self.get_cells(board, colour_map)
+        return Fore.WHITE + Style.BRIGHT + "\n".join(get_board_frame(len(letters)).get_lines(letters, colours))
+
+    def draw(self, board: np.ndarray, colour_map: Dict[Tuple[int, int], str]) -> None:
+        """Draw a board under whatever was drawn before it."""
+        if not self.render:
+            return
+
+        # The board is drawn wherever the cursor is, so the screen is no longer known
+        self.header = None
+        self.write(f"\n{self.get_str_board(board, colour_map)}\n\n")
+
+    def clear(self) -> None:
+        """Clear the screen, so the next screen is drawn in full."""
+        self.header = None
+
+        if self.render:
+            self.write("\x1b[2J\x1b[H")
+
+    def refresh(self, header: List[str], board: np.ndarray, colour_map: Dict[Tuple[int, int], str], footer=()) -> None:
+        """Draw the lines above the board, the board and the lines under it as the whole screen.
+        If the last screen had a board of the same length under as many lines, only what changed since is written."""
+        if not self.render:
+            return
+
+        letters, colours = self.get_cells(board, colour_map)
+        frame = get_board_frame(len(letters))
+        footer = list(footer)
+        board_line = len(header) + 2 # The screen line of the column labels, there is an empty line above and under the board
+        footer_line = board_line + frame.get_line_count() + 1
+        fits = footer_line + len(footer) <= shutil.get_terminal_size().lines
+
+        if not (self.incremental and fits and self.header is not None and len(header) == len(self.header) and len(letters) == len(self.letters)):
+            self.clear()
+            self.write(Fore.WHITE + Style.BRIGHT + "\n".join(header + [""] + frame.get_lines(letters, colours) + [""] + footer) + "\n")
+        else:
+            changes = []
+
+            for n, line in enumerate(header):
+                if line != self.header[n]:
+                    changes.append(f"\x1b[{n + 1};1H{Fore.WHITE}{Style.BRIGHT}{line}\x1b[K")
+
+            for x in range(frame.length):
+                if letters[x] != self.letters[x] or colours[x] != self.colours[x]:
+                    for y in range(frame.length):
+                        if letters[x][y] != self.letters[x][y] or colours[x][y] != self.colours[x][y]:
+                            changes.append(f"\x1b[{board_line + frame.get_cell_line(x)};{frame.get_cell_column(y)}H{getattr(Fore, colours[x][y])}{letters[x][y]}")
+
+            for n, line in enumerate(footer):
+                if n >= len(self.footer) or line != self.footer[n]:
+                    changes.append(f"\x1b[{footer_line + n};1H{Fore.WHITE}{Style.BRIGHT}{line}\x1b[K")
+
+            # Leave the cursor under the screen, where the next line is written
+            self.write("".join(changes) + f"\x1b[{footer_line + len(footer)};1H\x1b[J{Fore.WHITE}{Style.BRIGHT}")
+
+        # Only what is on the screen is kept if it can be drawn in place later
+        if self.incremental and fits:
+            self.header, self.footer, self.letters, self.colours = list(header), footer, letters, colours
+
+class Board:
+    """Create an board object."""
+    def __init__(self) -> None:
+        self.length = None # The length of the board
+        self.cells = None # The 2D array of the board, stored as letter codes
+        self.colour_map = None # The colours for each cell
+        self.starting_position = None # The current starting position
+        self.paths = None # A collection of paths
+        self.paths_full = None # A collection of full paths
+        self.selected_path = None # The current selected path
+        self.players = None # The current player list
+        self.player = None # The current player
+        self.previous_player = None # the previous player in the previous turn
+        self.previous_selected_path = None # the previous path selected by the player
+        self.word = None # The current player's word
+        self.used_words = None # Record every words used
+        self.winner = None # The winner of the current game
+        self.draw = False # Draw state
+        self.game_counter = 0 # Game counter for each game
+        self.turn_counter = 0 # Game counter for each game
+        self.game_duration = 0 # Game Duration of the whole game
+        self.empty_cells = 0 # How many cells are empty
+        self.path_empty = None # How many cells are empty on each path of the path table
+        self.move_records = [] # The cells filled by each move made with make_move, so they can be undone
+        self.cells_hash = 0 # The Zobrist hash of the letters on the board
+        self.renderer = Board_Renderer() # Draws the board on the terminal
+
+    def create_board(self, length: int) -> None:
+        """Create the game board."""
+        self.length = length
+        self.cells = np.full((self.length, self.length), EMPTY_CELL, dtype=np.uint8)
+        self.colour_map = self.set_colour_map()
+        self.empty_cells = self.length ** 2
+        self.path_empty = get_path_table(self.length).path_lengths.copy()
+        self.cells_hash = 0
+
+    @property
+    def matrix(self) -> Optional[np.ndarray]:
+        """Get the letters of the board as an 2D array of strings."""
+        if self.cells is None:
+            return None
+
+        return self.cells.view('S1').astype('U1')
+
+    @matrix.setter
+    def matrix(self, matrix: np.ndarray) -> None:
+        """Set the letters of the board from an 2D array of strings."""
+        self.cells = np.asarray(matrix, dtype='S1').view(np.uint8).copy()
+        self.length = len(self.cells)
+        self.count_empty_cells()
+        self.hash_cells()
+
+    @property
+    def position_hash(self) -> int:
+        """Get the Zobrist hash of the letters on the board and the used words."""
+        return self.cells_hash ^ (self.used_words.hash if self.used_words is not None else 0)
+
+    def get_letter(self, coord: Tuple[int, int]) -> str:
+        """Get the letter of a cell, an empty cell is a space."""
+        return chr(self.cells[coord])
+
+    def get_pattern(self, path: Tuple[Tuple[int, int], ...]) -> str:
+        """Get the letters on the path, an empty cell is a ".", as used by Lexicon.find_words."""
+        return bytes([self.cells[coord] for coord in path]).decode('ascii').replace(" ", ".")
+
+    def count_empty_cells(self) -> None:
+        """Count the empty cells again, needed only if the cells were changed without place_word."""
+        path_table = get_path_table(self.length)
+        empty = self.cells.ravel() == EMPTY_CELL
+        self.empty_cells = int(empty.sum())
+        self.path_empty = (empty[path_table.path_indices] & path_table.path_mask).sum(axis=1)
+
+    def hash_cells(self) -> None:
+        """Hash the letters on the board again, needed only if the cells were changed without place_word."""
+        cell_keys = get_cell_keys(self.length)
+        self.cells_hash = 0
+
+        for (x, y), letter in np.ndenumerate(self.cells):
+            self.cells_hash ^= cell_keys[x][y][letter]
+
+    def copy(self) -> "Board":
+        """Create a board that can be played on without changing this board, the players and paths are shared."""
+        board = copy.copy(self)
+        board.cells = self.cells.copy()
+        board.path_empty = self.path_empty.copy()
+        board.colour_map = dict(self.colour_map)
+        board.move_records = []
+
+        if self.used_words is not None:
+            board.used_words = self.used_words.copy()
+
+        return board
+
+    def snapshot(self) -> Tuple[np.ndarray, int, np.ndarray, int]:
+        """Take a snapshot of the cells, the empty cell counts and the hash of the cells."""
+        return self.cells.copy(), self.empty_cells, self.path_empty.copy(), self.cells_hash
+
+    def restore(self, snapshot: Tuple[np.ndarray, int, np.ndarray, int]) -> None:
+        """Restore the cells, the empty cell counts and the hash of the cells from a snapshot, in place."""
+        cells, self.empty_cells, path_empty, self.cells_hash = snapshot
+        np.copyto(self.cells, cells)
+        np.copyto(self.path_empty, path_empty)
+
+    def set_colour_map(self) -> Dict[Tuple[Any], Any]:
+        """Ini the colours for the board."""
+        return dict.fromkeys(get_board_frame(self.length).cells, "WHITE")
+
+    def check_draw(self) -> None:
+        """Check for a draw."""
+        if self.empty_cells == 0:
+            self.draw = True
+
+    def get_starting_position(self) -> int:
+        """Get the starting position of the player."""
+        self.display_game_title()
+        self.display_board()
+        self.check_draw()
+
+        if self.draw:
+            return 2
 
         try:
-            if not path1_res:
-                self.paths.pop(0)
-            if not path2_res:
-                self.paths.pop(-2)
-            if not path3_res:
-                self.paths.pop(1)
-        except IndexError:
-            self.paths = []
+            # Split the input to get the coordinates
+            user_input = [int(n) for n in input(Fore.WHITE + Style.BRIGHT + "Starting Position: ").split(" ")]
+
+            if len(user_input) == 1:
+                if 0 not in user_input:
+                    clear_screen(0)
+                    self.display_game_title()
+                    self.display_board()
+                    print(Fore.WHITE + Style.BRIGHT + "Starting Position: " + Fore.RED + Style.BRIGHT + "Invalid coordinates!")
+                    clear_screen()
+                    return self.get_starting_position()
+                else:
+                    return 0
+            else:
+                if 0 in user_input:
+                    clear_screen(0)
+                    self.display_game_title()
+                    self.display_board()
+                    print(Fore.WHITE + Style.BRIGHT + "Starting Position: " + Fore.RED + Style.BRIGHT + "Invalid coordinates!")
+                    clear_screen()
+                    return self.get_starting_position()
+                else:
+                    if 0 < user_input[0] <= self.length and 0 < user_input[1] <= self.length:
+                        if user_input[0] == 1 and user_input[1] == user_input[0] or user_input[0] == 1 and user_input[1] > user_input[0] or user_input[1] == 1 and user_input[1] < user_input[0] or user_input[0] == self.length and user_input[1] == user_input[0] or user_input[0] == self.length and user_input[0] > user_input[1] or user_input[1] == self.length and user_input[1] > user_input[0]:
+                            self.starting_position = tuple([n - 1 for n in user_input])
+                            return 1
+                        else:
+                            clear_screen(0)
+                            self.display_game_title()
+                            self.display_board()
+                            print(Fore.WHITE + Style.BRIGHT + "Starting Position: " + Fore.RED + Style.BRIGHT + "Invalid coordinates!")
+                            clear_screen()
+                            return self.get_starting_position()
+                    else:
+                        clear_screen(0)
+                        self.display_game_title()
+                        self.display_board()
+                        print(Fore.WHITE + Style.BRIGHT + "Starting Position: " + Fore.RED + Style.BRIGHT + "Invalid coordinates!")
+                        clear_screen()
+                        return self.get_starting_position()
+        except (IndexError, ValueError):
+            clear_screen(0)
+            self.display_game_title()
+            self.display_board()
+            print(Fore.WHITE + Style.BRIGHT + "Starting Position: " + Fore.RED + Style.BRIGHT + "Invalid coordinates!")
+            clear_screen()
+            return self.get_starting_position()
+
+    def create_valid_paths(self, full_paths=None) -> None:
+        """Generate paths based on the starting position. Check the list for paths that are full. Remove them if they are."""
+        path_table = get_path_table(self.length)
+        self.paths_full = list(path_table.paths[self.starting_position])
+
+        if full_paths is None:
+            first_row = path_table.first_row[self.starting_position]
+            full_paths = np.zeros(len(path_table.path_indices), dtype=bool)
+            full_paths[first_row:first_row + 3] = self.get_full_paths(slice(first_row, first_row + 3))
+
+        self.paths = path_table.get_valid_paths(self.starting_position, full_paths)
+
+    def get_full_paths(self, rows=slice(None)) -> np.ndarray:
+        """Check the paths of the path table at once, a path is full if none of its cells are empty."""
+        return self.path_empty[rows] == 0
+
+    def generate_moves(self, lexicon: "Lexicon", used_words=None, order=None, paths=None, rng=random) -> Generator[Tuple[Tuple[int, int], Tuple[Tuple[int, int], ...], str], Any, None]:
+        """Generate the legal (starting position, path, word) moves one at a time, so the caller can stop after the moves it needs.
+        The order is that of the path table and the word list, "random", or "strength" for the strongest words first.
+        The used words are those of the board unless others are given, and only the given paths are tried if there are any."""
+        used_words = self.used_words if used_words is None else used_words
+
+        if paths is None:
+            path_table = get_path_table(self.length)
+            full_paths = self.get_full_paths()
+            paths = (path for coord in path_table.starting_positions for path in path_table.get_valid_paths(coord, full_paths))
+
+        # The mask backend matches every path of the turn in one go, the bitset backend looks up each path only when it is reached
+        if LEXICON_BACKEND == "mask":
+            paths = list(paths)
+            lexicon.find_words_batch([pattern for pattern in map(self.get_pattern, paths) if "." in pattern])
+
+        if order == "strength":
+            moves = []
+
+            for path in paths:
+                pattern = self.get_pattern(path)
+
+                if "." in pattern:
+                    moves.append(zip(lexicon.find_strong_words(pattern), it.repeat(path)))
+
+            # The words of each path are already strongest first, so merging them only looks at each word when it is reached
+            for (_, word), path in heapq.merge(*moves):
+                if word not in used_words:
+                    yield path[0], path, word
+
+            return
+
+        for path in lazy_shuffle(list(paths), rng) if order == "random" else paths:
+            pattern = self.get_pattern(path)
+
+            if "." not in pattern:
+                continue
+
+            words = lexicon.find_words(pattern)
+
+            for word in lazy_shuffle(words, rng) if order == "random" else words:
+                if word not in used_words:
+                    yield path[0], path, word
 
     def get_selected_path(self) -> int:
         """Get selected path from player"""
@@ -650,10 +2123,10 @@ class Board:
 
         # Labelling each path with its corresponding character and assign each coordinate with its colour
         for coord in self.selected_path:
-            if self.matrix[coord] == " ":
+            if self.cells[coord] == EMPTY_CELL:
                 temp_board[coord] = "•"
             else:
-                temp_board[coord] = self.matrix[coord]
+                temp_board[coord] = self.get_letter(coord)
 
             temp_colour_map[coord] = "GREEN"
 
@@ -665,51 +2138,42 @@ class Board:
         self.display_game_title(False, False, False, True)
         self.display_board(temp_board, temp_colour_map)
 
-    def display_game_title(self, is_draw=False, there_is_winner=False, has_resigned=False, display_used_words=False) -> None:
-        """Display the game title."""
+    def get_game_title(self, is_draw=False, there_is_winner=False, has_resigned=False, display_used_words=False) -> List[str]:
+        """Get the lines of the game title."""
+        title = [" VS ".join([f"{i['name']} ({i['difficulty']})" if i['difficulty'] is not None else f"{i['name']}" for i in self.players])]
+
         if is_draw:
-            print(Fore.WHITE + Style.BRIGHT + " VS ".join([f"{i['name']} ({i['difficulty']})" if i['difficulty'] is not None else f"{i['name']}" for i in self.players]), sep='', end='')
-            print(f"\nGame: {self.game_counter} | Turn: {self.turn_counter} | Draw!\nGame {self.game_counter} has ended! | Game Duration: {self.game_duration}")
+            title.append(f"Game: {self.game_counter} | Turn: {self.turn_counter} | Draw!")
+            title.append(f"Game {self.game_counter} has ended! | Game Duration: {self.game_duration}")
         elif there_is_winner:
-            print(Fore.WHITE + Style.BRIGHT + " VS ".join([f"{i['name']} ({i['difficulty']})" if i['difficulty'] is not None else f"{i['name']}" for i in self.players]), sep='', end='')
-            print(f"\nGame: {self.game_counter} | Turn: {self.turn_counter} | {self.winner} won!\nGame {self.game_counter} has ended! | Game Duration: {self.game_duration}")
-        elif has_resigned:
-            print(Fore.WHITE + Style.BRIGHT + " VS ".join([f"{i['name']} ({i['difficulty']})" if i['difficulty'] is not None else f"{i['name']}" for i in self.players]), sep='', end='')
-            print(f"\nGame: {self.game_counter} | Turn: {self.turn_counter} | {self.player}'s Turn")
-            print(f"{self.player} has resigned!")
-        elif display_used_words:
-            print(Fore.WHITE + Style.BRIGHT + " VS ".join([f"{i['name']} ({i['difficulty']})" if i['difficulty'] is not None else f"{i['name']}" for i in self.players]), sep='', end='')
-            print(f"\nGame: {self.game_counter} | Turn: {self.turn_counter} | {self.player}'s Turn")
-
-            if self.used_words is not None:
-                print(Fore.WHITE + Style.BRIGHT + "Word(s) used: " + Fore.RED + Style.BRIGHT + ', '.join(self.used_words))
-            else:
-                print(Fore.WHITE + Style.BRIGHT + "Word(s) used:")
+            title.append(f"Game: {self.game_counter} | Turn: {self.turn_counter} | {self.winner} won!")
+            title.append(f"Game {self.game_counter} has ended! | Game Duration: {self.game_duration}")
+        elif self.player is None:
+            title.append(f"Game: {self.game_counter} | Turn: {self.turn_counter}")
+            title.append(f"Game {self.game_counter} has no moves!")
         else:
-            print(Fore.WHITE + Style.BRIGHT + " VS ".join([f"{i['name']} ({i['difficulty']})" if i['difficulty'] is not None else f"{i['name']}" for i in self.players]), sep='', end='')
-            print(f"\nGame: {self.game_counter} | Turn: {self.turn_counter} | {self.player}'s Turn")
+            title.append(f"Game: {self.game_counter} | Turn: {self.turn_counter} | {self.player}'s Turn")
 
-            if self.turn_counter == 0:
-                print(f"Game {self.game_counter} has started!")
+            if has_resigned:
+                title.append(f"{self.player} has resigned!")
+            elif display_used_words:
+                if self.used_words is not None:
+                    title.append("Word(s) used: " + Fore.RED + Style.BRIGHT + ', '.join(self.used_words))
+                else:
+                    title.append("Word(s) used:")
+            elif self.turn_counter == 0:
+                title.append(f"Game {self.game_counter} has started!")
             else:
-                print(f"{self.previous_player} placed down {self.word}")
-
-    def display_board(self, board=None, colour_map=None, get_str_board=False, computer_player=False) -> int:
-        """Display the board."""
-        def chunks(data: Dict[Tuple[int, int], str], SIZE=10000) -> Generator[Dict[Tuple[int, int], str], any, None]:
-            """Divide the data into chunks."""
-            itt = iter(data)
+                title.append(f"{self.previous_player} placed down {self.word}")
 
-            for i in range(0, len(data), SIZE):
-                yield {k: data[k] for k in it.islice(itt, SIZE)}
+        return title
 
-        if colour_map is None:
-            colour_map = self.colour_map
-
-        if board is None:
-            board = self.matrix
+    def display_game_title(self, is_draw=False, there_is_winner=False, has_resigned=False, display_used_words=False) -> None:
+        """Display the game title."""
+        print(Fore.WHITE + Style.BRIGHT + "\n".join(self.get_game_title(is_draw, there_is_winner, has_resigned, display_used_words)))
 
-        # Colour the previous word placed by the player
+    def colour_previous_path(self, computer_player=False) -> None:
+        """Colour the previous word placed by the player."""
         if self.previous_selected_path is not None:
             for key in self.colour_map:
                 self.colour_map[key] = "WHITE"
@@ -723,87 +2187,72 @@ class Board:
             if computer_player:
                 self.colour_map[self.previous_selected_path[0]] = "YELLOW"
 
-        # Create a list of chunks
-        chunks_list = []
-
-        # Create chunks of the colour map and store them in the chunks list
-        for item in chunks(colour_map, self.length):
-            chunks_list.append(item)
+    def display_board(self, board=None, colour_map=None, get_str_board=False, computer_player=False) -> int:
+        """Display the board."""
+        if colour_map is None:
+            colour_map = self.colour_map
 
-        # Display the game board
         if board is None:
             board = self.matrix
 
-        # Create representation of the board
-        str_board = Fore.WHITE + Style.BRIGHT + " "
-        str_board += "  "
-
-        # Labelling top columns
-        for column_number in range(self.length):
-            if column_number < 9:
-                str_board += f"   {column_number + 1}"
-            else:
-                str_board += f"  {column_number + 1}"
-
-        str_board +="\n    ┌───┬─"
-
-        for _ in range(self.length - 2):
-            str_board+= "──┬─"
-
-        str_board += "──┐\n"
-
-        # Labelling left rows
-        lines = 0
-
-        for chunk in chunks_list:
-            if chunks_list.index(chunk) < 9:
-                str_board += f"  {str(chunks_list.index(chunk) + 1)} "
-            else:
-                str_board += f" {str(chunks_list.index(chunk) + 1)} "
-
-            # Assign each string to its corresponding colour depending on the coordinates
-            for coord, colour in chunk.items():
-                set_colour = getattr(Fore, colour)
-                str_board += Fore.WHITE + "│" + set_colour + f" {board[coord]} " + Fore.WHITE
-
-            # Labelling right rows
-            str_board += f"│ {str(chunks_list.index(chunk) + 1)}\n    ├─"
-
-            for _ in range(self.length - 1):
-                str_board += "──┼─"
-
-            if lines < self.length - 1:
-                str_board += "──┤\n"
-                lines += 1
-            else:
-                str_board += "\r"
-
-        # Labelling bottom columns
-        str_board +="    └───┴─"
-
-        for _ in range(self.length - 2):
-            str_board+= "──┴─"
-
-        str_board += "──┘\n   "
-
-        for column_number in range(self.length):
-            if column_number < 9:
-                str_board += f"   {column_number + 1}"
-            else:
-                str_board += f"  {column_number + 1}"
+        self.colour_previous_path(computer_player)
 
         if get_str_board:
-            return str_board
+            return self.renderer.get_str_board(board, colour_map)
         else:
-            print(f"\n{str_board}\n")
+            self.renderer.draw(board, colour_map)
+
+    def refresh_screen(self, title: List[str], footer=()) -> None:
+        """Draw the game title, the board and the lines under it over the last screen, only what changed is drawn again."""
+        self.colour_previous_path()
+        self.renderer.refresh(title, self.matrix, self.colour_map, footer)
 
     def place_word(self, word: str) -> None:
         """Place the word onto the game board."""
         self.word = word
         self.previous_selected_path = self.selected_path
-
-        for coord in self.previous_selected_path:
-            self.matrix[coord] = self.word[self.previous_selected_path.index(coord)]
+        path_table = get_path_table(self.length)
+        cell_keys = get_cell_keys(self.length)
+
+        for coord, letter in zip(self.previous_selected_path, self.word.encode('ascii')):
+            # Keep the empty cell counts up to date as cells are filled
+            if self.cells[coord] == EMPTY_CELL and letter != EMPTY_CELL:
+                self.empty_cells -= 1
+                self.path_empty[path_table.cell_paths[coord]] -= 1
+
+            # Swap the key of the old letter for the key of the new one
+            self.cells_hash ^= cell_keys[coord[0]][coord[1]][self.cells[coord]] ^ cell_keys[coord[0]][coord[1]][letter]
+            self.cells[coord] = letter
+
+    def make_move(self, path: Tuple[Tuple[int, int], ...], word: str) -> None:
+        """Place the word onto the cells and record the move, the display of the board is left as it is."""
+        path_table = get_path_table(self.length)
+        cell_keys = get_cell_keys(self.length)
+        filled_cells = []
+
+        for coord, letter in zip(path, word.encode('ascii')):
+            if self.cells[coord] == EMPTY_CELL:
+                self.cells[coord] = letter
+                self.cells_hash ^= cell_keys[coord[0]][coord[1]][letter]
+                self.empty_cells -= 1
+                self.path_empty[path_table.cell_paths[coord]] -= 1
+                filled_cells.append(coord)
+
+        self.used_words.append(word)
+        self.move_records.append(filled_cells)
+
+    def unmake_move(self) -> None:
+        """Undo the last move made with make_move."""
+        path_table = get_path_table(self.length)
+        cell_keys = get_cell_keys(self.length)
+
+        for coord in self.move_records.pop():
+            self.cells_hash ^= cell_keys[coord[0]][coord[1]][self.cells[coord]]
+            self.cells[coord] = EMPTY_CELL
+            self.empty_cells += 1
+            self.path_empty[path_table.cell_paths[coord]] += 1
+
+        self.used_words.pop()
 
 class Official_Agent:
     """Create an agent object."""
@@ -816,12 +2265,18 @@ class Official_Agent:
         self.used_words = None # The used words for a simulated game
         self.board_length = None # The length of the board
         self.options = [] # A collection of options
+        self.unfinished_options = [] # The first moves of the simulated games the deadline stopped, only played if no simulated game finished
         self.players_list = [{"name": f"agent {player + 1}", "path_selected": None, "word_selected": None} for player in range(2)] # A list of players for an simulated game
         self.final_selected_path = None # The agent's selected path for the real game
         self.final_selected_word = None # The agent's selected word for the real game
         self.considered_starting_position = None # The considered starting position from the current board
         self.considered_paths = None # The considered paths from the current board
+        self.full_paths = None # Which paths of the path table are full on the current board
         self.draw_detected = False # Check if the real game has been drawn
+        self.headless = False # Do not display the thinking animation
+        self.time_budget = AGENT_TIME_BUDGET # How many seconds to think about each move, None runs a fixed number of rollouts
+        self.deadline = None # When the time budget of the current move runs out, None without a time budget
+        self.use_book = True # Play the move of the opening book when it has one
 
     @staticmethod
     def calculate_word_strength(word: str) -> int:
@@ -836,46 +2291,17 @@ class Official_Agent:
 
         return total
 
-    def get_word(self, board: np.array, path_length: int, path_selected: List[Tuple[int, int]]) -> Optional[Any]:
-        """Get a word based on the selected path."""
-        common_letters = []
-
-        for coord in path_selected:
-            common_letters.append(board[coord])
-
-        word_required_to_match = [word.replace(" ", ".") for word in common_letters]
-
-        if "." not in word_required_to_match:
-            return 0
-        else:
-            try:
-                words_found = [word for word in self.vocabulary[path_length] if re.match(re.compile(''.join(word_required_to_match)), word)]
-            except KeyError:
-                return 0
-
-        try:
-            word_selected = random.choice(words_found)
-        except IndexError:
-            return 0
-
-        if len(word_selected) == path_length and word_selected not in self.used_words:
-            self.used_words.append(word_selected)
-            return word_selected
-        else:
-            return 0
-
     def generate_starting_positions(self) -> None:
         """Generate starting positions with those without resulting with full paths."""
         self.considered_starting_position = []
+        self.full_paths = self.analyse_board.get_full_paths()
 
-        for x in range(self.board_length):
-            for y in range(self.board_length):
-                if x == 0 and y == x or x == 0 and y > x or y == 0 and y < x or x == self.board_length - 1 and y == x or x == self.board_length - 1 and x > y or y == self.board_length - 1 and y > x:
-                    self.analyse_board.starting_position = x, y
-                    self.analyse_board.create_valid_paths()
+        for coord in get_path_table(self.board_length).starting_positions:
+            self.analyse_board.starting_position = coord
+            self.analyse_board.create_valid_paths(self.full_paths)
 
-                    if self.analyse_board.paths:
-                        self.considered_starting_position.append(self.analyse_board.starting_position)
+            if self.analyse_board.paths:
+                self.considered_starting_position.append(self.analyse_board.starting_position)
 
     def generate_paths(self) -> None:
         """Generate paths based on the starting positions."""
@@ -883,41 +2309,26 @@ class Official_Agent:
 
         for coord in self.considered_starting_position:
             self.analyse_board.starting_position = coord
-            self.analyse_board.create_valid_paths()
+            self.analyse_board.create_valid_paths(self.full_paths)
 
             for path in self.analyse_board.paths:
                 self.analyse_board.selected_path = path
                 self.considered_paths.append(path)
 
-    def make_turn(self, board: np.array, path_list=None) -> Union[Tuple[Any, Any], int]:
-        """Make a turn."""
-        if path_list is None:
-            considered_paths = self.considered_paths.copy()
-        else:
-            considered_paths = path_list
-
-        try:
-            path_selected = random.sample(considered_paths, len(considered_paths))[0]
-        except IndexError:
-            return 0
-
-        word_selected = self.get_word(board.matrix, len(path_selected), path_selected)
-
-        if word_selected != 0:
+    def make_turn(self, board: "Board", path_list=None) -> Union[Tuple[Any, Any], int]:
+        """Make a turn with a random legal move on one of the considered paths, or one of the paths in the path list if it is given."""
+        for _, path_selected, word_selected in board.generate_moves(self.vocabulary, self.used_words, "random", self.considered_paths if path_list is None else path_list):
             return word_selected, path_selected
-        elif considered_paths:
-            considered_paths.remove(path_selected)
-            return self.make_turn(board, considered_paths)
-        elif not considered_paths:
-            return 0
+
+        return 0
 
     def get_result(self) -> None:
         """Get the results from this simulated game."""
-        board = Board()
-        board.matrix = self.analyse_board.matrix.copy()
+        board = self.analyse_board
         current_players_list = self.players_list.copy()
         first_selected_path = None
         first_selected_word = None
+        turn_number = 0
         run = True
         draw = False
 
@@ -926,20 +2337,30 @@ class Official_Agent:
 
         while run:
             # Display that the computer player is thinking to give an indication that the program did not respond or whatever
-            print(f"\r{self.agent_name} ({self.difficulty}) is thinking {spin.next()}", end="")
-            time.sleep(0.4)
+            if not self.headless:
+                print(f"\r{self.agent_name} ({self.difficulty}) is thinking {spin.next()}", end="")
+
+                # Only slow the animation down when the agent is not racing a deadline
+                if self.time_budget is None:
+                    time.sleep(0.4)
 
             if len(current_players_list) < 2:
                 run = False
             elif draw:
                 outcome = 0
-                self.options.append({"outcome": outcome, "turn_number": board.turn_counter, "path": first_selected_path, "word": first_selected_word})
+                self.options.append({"outcome": outcome, "turn_number": turn_number, "path": first_selected_path, "word": first_selected_word})
                 run = False
             else:
                 for player in current_players_list:
+                    # Stop the simulated game once the deadline passes and it has a first move. Its outcome is not known, so it is kept apart from the finished games
+                    if first_selected_path is not None and self.out_of_time():
+                        self.unfinished_options.append({"outcome": 0, "turn_number": turn_number, "path": first_selected_path, "word": first_selected_word})
+                        run = False
+                        break
+
                     player_turn = self.make_turn(board)
 
-                    if " " not in board.matrix:
+                    if board.empty_cells == 0:
                         draw = True
                     elif player_turn == 0:
                         current_players_list.remove(player)
@@ -957,10 +2378,10 @@ class Official_Agent:
 
                         if player['name'] == "agent 1":
                             outcome = -1
-                            self.options.append({"outcome": outcome, "turn_number": board.turn_counter, "path": first_selected_path, "word": first_selected_word})
+                            self.options.append({"outcome": outcome, "turn_number": turn_number, "path": first_selected_path, "word": first_selected_word})
                         else:
                             outcome = 1
-                            self.options.append({"outcome": outcome, "turn_number": board.turn_counter, "path": first_selected_path, "word": first_selected_word})
+                            self.options.append({"outcome": outcome, "turn_number": turn_number, "path": first_selected_path, "word": first_selected_word})
 
                         run = False
                     else:
@@ -971,8 +2392,7 @@ class Official_Agent:
                             selected_word = None
                             selected_path = None
 
-                        for coord in selected_path:
-                            board.matrix[coord] = selected_word[selected_path.index(coord)]
+                        board.make_move(selected_path, selected_word)
 
                         if first_selected_path is None and first_selected_word is None:
                             first_selected_path = selected_path
@@ -980,11 +2400,20 @@ class Official_Agent:
                             player['path_selected'] = first_selected_path
                             player['word_selected'] = first_selected_word
 
-                        board.turn_counter += 1
+                        turn_number += 1
+
+        # Undo the moves of this simulated game so the next one starts from the current board
+        while board.move_records:
+            board.unmake_move()
 
     def make_decision(self) -> int:
         """Agent forms decision making presented with current options to determine the best possible strategy."""
         options = [option for option in self.options if option['path'] is not None]
+
+        # A move from a simulated game the deadline stopped is only played if no simulated game finished, so a tight budget does not favour untried words
+        if not options:
+            options = [option for option in self.unfinished_options if option['path'] is not None]
+
         option_length = len(options)
 
         # If any of the outcomes is not a lost, then proceed to select the best possible strategy
@@ -1028,41 +2457,56 @@ class Official_Agent:
                         self.final_selected_path = path
                         self.final_selected_word = word
 
+    def run_searches(self, search: Callable[[], None], runs: int) -> None:
+        """Run the search a number of times, or until the time budget of the move is spent if the agent has one."""
+        if self.time_budget is None:
+            for _ in range(runs):
+                search()
+        else:
+            self.deadline = time.perf_counter() + self.time_budget
+
+            # Always search once, so there is a move to play however small the budget is. The search itself stops at the deadline once it has a move
+            search()
+
+            while not self.out_of_time():
+                search()
+
+    def out_of_time(self) -> bool:
+        """Check if the time budget of the current move has run out."""
+        return self.deadline is not None and time.perf_counter() >= self.deadline
+
+    def play_book_move(self) -> bool:
+        """Play the move of the opening book for the current position, return False if the book has none."""
+        move = get_opening_book().get_move(self.analyse_board, get_vocabulary(self.difficulty)) if self.use_book else None
+
+        if move is None:
+            return False
+
+        self.final_selected_word, self.final_selected_path = move
+        return True
+
     def play(self) -> None:
         """Make the agent play the game."""
-        self.used_words = self.analyse_used_words.copy()
+        self.analyse_board.used_words = self.analyse_used_words.copy()
+        self.analyse_board.move_records = []
+        self.used_words = self.analyse_board.used_words
         self.generate_starting_positions()
         self.generate_paths()
         # self.debugger()
 
-        if " " not in self.analyse_board.matrix:
+        if self.analyse_board.empty_cells == 0:
             self.draw_detected = True
-        elif not self.draw_detected:
+        elif not self.draw_detected and not self.play_book_move():
             # Determine the runs by difficulty, the higher the runs, the longer it takes for the agent to make a turn
             if self.difficulty == "EASY":
                 self.vocabulary = vocab_1
-                run = 3
-
-                while run > 0:
-                    self.get_result()
-                    self.used_words = self.analyse_used_words.copy()
-                    run -= 1
+                self.run_searches(self.get_result, 3)
             elif self.difficulty == "MEDIUM":
                 self.vocabulary = vocab_2
-                run = 8
-
-                while run > 0:
-                    self.get_result()
-                    self.used_words = self.analyse_used_words.copy()
-                    run -= 1
+                self.run_searches(self.get_result, 8)
             elif self.difficulty == "HARD":
                 self.vocabulary = game_word_list
-                run = 8
-
-                while run > 0:
-                    self.get_result()
-                    self.used_words = self.analyse_used_words.copy()
-                    run -= 1
+                self.run_searches(self.get_result, 8)
 
             self.make_decision()
 
@@ -1087,22 +2531,19 @@ class Official_Agent:
         print(Fore.WHITE + Style.BRIGHT + f"{title}\n", "-" * len(title), "\n", sep='')
         print("Raw Observations:", end='')
         self.analyse_board.display_board()
+        temp_board = self.analyse_board.matrix
         temp_colour_map = self.analyse_board.set_colour_map()
 
         for coord in self.considered_starting_position:
             self.analyse_board.starting_position = coord
 
-            if self.analyse_board.matrix[coord] == " ":
-                self.analyse_board.matrix[coord] = "•"
+            if temp_board[coord] == " ":
+                temp_board[coord] = "•"
 
             temp_colour_map[coord] = "YELLOW"
 
         print("Considered Starting Positions:", end='')
-        self.analyse_board.display_board(None, temp_colour_map)
-
-        for coord in self.considered_starting_position:
-            if self.analyse_board.matrix[coord] == "•":
-                self.analyse_board.matrix[coord] = " "
+        self.analyse_board.display_board(temp_board, temp_colour_map)
 
         print("Word(s) Used: " + Fore.RED + Style.BRIGHT + ', '.join(self.analyse_used_words))
 
@@ -1129,14 +2570,315 @@ class Official_Agent:
         print("Press any key to continue...")
         msvcrt.getch()
 
+class Search_Node:
+    """Create an search node object, a move of the search tree with the outcomes of the rollouts through it."""
+    def __init__(self, move=None) -> None:
+        self.move = move # The word and path that lead to this position
+        self.visits = 0 # How many rollouts went through this move
+        self.score = 0 # The sum of the outcomes of those rollouts for the player who made the move
+        self.children = [] # The moves tried from this position
+
+class MCTS_Agent(Official_Agent):
+    """Create an agent object that spends its rollouts on the most promising moves with Monte Carlo tree search."""
+    def __init__(self) -> None:
+        super().__init__()
+        self.iterations = MCTS_ITERATIONS # How many rollouts to run for each move without a time budget
+        self.root = None # The search tree of the current move
+        self.transposition_table = None # The outcomes of the positions already searched, kept across rollouts and turns
+
+    def expand(self, node: Search_Node) -> Optional[Search_Node]:
+        """Try a random move from the position with make_turn, return the child it leads to or None if no word was found."""
+        player_turn = self.make_turn(self.analyse_board)
+
+        if player_turn == 0:
+            return None
+
+        for child in node.children:
+            if child.move == player_turn:
+                return child
+
+        child = Search_Node(player_turn)
+        node.children.append(child)
+        return child
+
+    @staticmethod
+    def select_child(node: Search_Node) -> Search_Node:
+        """Select the child with the best upper confidence bound."""
+        log_visits = math.log(node.visits)
+        return max(node.children, key=lambda child: child.score / child.visits + MCTS_EXPLORATION * math.sqrt(log_visits / child.visits))
+
+    def playout(self) -> Optional[int]:
+        """Play random moves until the game ends, return the outcome for the player to move when it started, None if the deadline passed first."""
+        board = self.analyse_board
+        outcome = -1
+
+        while board.empty_cells:
+            if self.out_of_time():
+                return None
+
+            player_turn = self.make_turn(board)
+
+            if player_turn == 0:
+                return outcome
+
+            board.make_move(player_turn[1], player_turn[0])
+            outcome = -outcome
+
+        return 0
+
+    def search(self) -> None:
+        """Run one rollout from the root, through the tree and then at random, and update the moves it went through."""
+        board = self.analyse_board
+        table = self.transposition_table
+        node = self.root
+        nodes = [node]
+        positions = [board.position_hash] # The hash of the position at each node
+        outcome = None # The outcome for the player to move at the last node
+        known = False # Whether the outcome was taken from the transposition table
+        cut_short = False # Whether the deadline stopped the playout, its outcome is then not known
+
+        while outcome is None:
+            child = None
+            entry = table.get(positions[-1])
+
+            if not board.empty_cells:
+                outcome = 0
+                break
+            elif entry is not None and entry[2]:
+                outcome = entry[1]
+                known = True
+                break
+            # Only try another move once the moves already tried have had enough rollouts
+            elif len(node.children) < MCTS_WIDENING * (node.visits + 1) ** MCTS_WIDENING_POWER:
+                child = self.expand(node)
+
+            if child is None and node.children:
+                child = self.select_child(node)
+
+            if child is None:
+                outcome = -1
+                known = True
+                table.solve(positions[-1], outcome)
+            else:
+                board.make_move(child.move[1], child.move[0])
+                nodes.append(child)
+                positions.append(board.position_hash)
+                node = child
+
+                if not child.visits:
+                    entry = table.get(positions[-1])
+
+                    if not board.empty_cells:
+                        outcome = 0
+                    elif entry is not None:
+                        # Reuse the rollouts already played from this position, in this search or an earlier one
+                        outcome = entry[1] / entry[0]
+                        known = True
+                    else:
+                        outcome = self.playout()
+
+                        if outcome is None:
+                            # The deadline stopped the playout, so its outcome is not known. It is thrown away if the root already has a move to play
+                            if any(root_child.visits for root_child in self.root.children):
+                                nodes[-2].children.remove(child)
+
+                                while board.move_records:
+                                    board.unmake_move()
+
+                                return
+
+                            # Otherwise count the visit so the move can be played, but keep the unknown outcome out of the transposition table
+                            outcome = 0
+                            cut_short = True
+
+        # The players take turns, so the outcome flips for each move going up the tree
+        score = -outcome
+
+        for n, node in reversed(list(enumerate(nodes))):
+            node.visits += 1
+            node.score += score
+
+            # The table already holds the outcome of the last position if it came from there
+            if not cut_short and (n < len(nodes) - 1 or not known):
+                table.record(positions[n], -score)
+
+            score = -score
+
+        while board.move_records:
+            board.unmake_move()
+
+    def play(self) -> None:
+        """Make the agent play the game."""
+        self.analyse_board.used_words = self.analyse_used_words.copy()
+        self.analyse_board.move_records = []
+        self.used_words = self.analyse_board.used_words
+        self.vocabulary = get_vocabulary(self.difficulty)
+        self.generate_starting_positions()
+        self.generate_paths()
+        self.root = Search_Node()
+        self.transposition_table = get_transposition_table(self.difficulty)
+
+        if self.analyse_board.empty_cells == 0:
+            self.draw_detected = True
+            return
+        elif self.play_book_move():
+            return
+
+        # The thinking animation
+        spin = Spinner(Spin1)
+
+        def think() -> None:
+            if not self.headless:
+                print(f"\r{self.agent_name} ({self.difficulty}) is thinking {spin.next()}", end="")
+
+            self.search()
+
+        self.run_searches(think, self.iterations)
+
+        # Play the move with the most rollouts, it is the one the search trusts the most
+        if self.root.children:
+            best = max(self.root.children, key=lambda child: (child.visits, child.score / child.visits, self.calculate_word_strength(child.move[0])))
+            self.final_selected_word, self.final_selected_path = best.move
+
+class Node_Limit_Reached(Exception):
+    """The solver searched more positions than its node limit allows."""
+
+class Solver:
+    """Create an solver object, which finds the exact outcome of a two player position with alpha-beta search over every legal move."""
+    def __init__(self, vocabulary: Lexicon, node_limit=SOLVER_NODE_LIMIT) -> None:
+        self.vocabulary = vocabulary # The words the players can use
+        self.node_limit = node_limit # The most positions to search for one solve, None searches until solved
+        self.nodes = 0 # How many positions the current solve has searched
+        self.table = Transposition_Table(SOLVER_TABLE_SIZE) # The (lower, upper) bounds on the outcome of each searched position
+
+    def negamax(self, board: Board, alpha: int, beta: int) -> int:
+        """Search the position, return its outcome for the player to move if it is between alpha and beta, otherwise a bound past them."""
+        if not board.empty_cells:
+            return 0
+
+        key = board.position_hash
+        lower, upper = self.table.get(key) or (-1, 1)
+
+        if lower == upper or lower >= beta:
+            return lower
+        elif upper <= alpha:
+            return upper
+
+        self.nodes += 1
+
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            raise Node_Limit_Reached
+
+        alpha = window_alpha = max(alpha, lower)
+        beta = min(beta, upper)
+        best = -1 # A player who cannot move has lost
+
+        for _, path, word in board.generate_moves(self.vocabulary, order="strength"):
+            board.make_move(path, word)
+
+            try:
+                value = -self.negamax(board, -beta, -alpha)
+            finally:
+                board.unmake_move()
+
+            best = max(best, value)
+            alpha = max(alpha, best)
+
+            if alpha >= beta:
+                break
+
+        # A result outside the window is only a bound, keep the tighter of it and what was already known
+        if best <= window_alpha:
+            upper = min(upper, best)
+        elif best >= beta:
+            lower = max(lower, best)
+        else:
+            lower = upper = best
+
+        self.table.add(key, (lower, upper))
+        return best
+
+    def evaluate(self, board: Board) -> Optional[int]:
+        """Get the exact outcome of the position for the player to move, None if it cannot be solved within the node limit."""
+        self.nodes = 0
+
+        try:
+            return self.negamax(board, -1, 1)
+        except Node_Limit_Reached:
+            return None
+
+    def solve(self, board: Board) -> Optional[Tuple[int, Optional[Tuple[str, Tuple[Tuple[int, int], ...]]]]]:
+        """Get the exact outcome of the position for the player to move and a (word, path) that reaches it, None if it cannot be solved within the node limit.
+        The move is None if the player cannot move."""
+        self.nodes = 0
+        best = -1
+        best_move = None
+
+        try:
+            if not board.empty_cells:
+                return 0, None
+
+            for _, path, word in board.generate_moves(self.vocabulary, order="strength"):
+                board.make_move(path, word)
+
+                try:
+                    value = -self.negamax(board, -1, -best)
+                finally:
+                    board.unmake_move()
+
+                if best_move is None or value > best:
+                    best = value
+                    best_move = word, path
+
+                if best == 1:
+                    break
+        except Node_Limit_Reached:
+            return None
+
+        return best, best_move
+
+class Solver_Agent(MCTS_Agent):
+    """Create an agent object that plays perfectly once the position is small enough to solve, and searches with MCTS until then."""
+    def play(self) -> None:
+        """Make the agent play the game."""
+        board = self.analyse_board
+        board.used_words = self.analyse_used_words.copy()
+        board.move_records = []
+
+        if board.empty_cells == 0:
+            self.draw_detected = True
+            return
+        elif board.empty_cells <= SOLVER_EMPTY_CELLS:
+            if not self.headless:
+                print(f"\r{self.agent_name} ({self.difficulty}) is solving the board", end="")
+
+            solved = get_solver(self.difficulty).solve(board)
+
+            if solved is not None:
+                outcome, move = solved
+
+                # Let the MCTS search reuse the outcome if a later position is too big to solve
+                get_transposition_table(self.difficulty).solve(board.position_hash, outcome)
+
+                if move is not None:
+                    self.final_selected_word, self.final_selected_path = move
+
+                return
+
+        super().play()
+
 class Game:
     """Create an game object."""
-    def __init__(self, starting_counter: int, length: int, players: List[Dict[str, str]], total_game_number=0, sim=False) -> None:
+    def __init__(self, starting_counter: int, length: int, players: List[Dict[str, str]], total_game_number=0, sim=False, headless=False, write_replays=True) -> None:
         self.total_game_number = total_game_number # The number of games to be simulated
         self.sim = sim # Simulated state
+        self.headless = headless # Play without rendering, sleeping or asking for input
+        self.write_replays = write_replays # Write a replay file for every simulated game
         self.players_list = players # Current list of players accessed
         self.removed_players = [] # Record every removed players
-        self.used_words = [] # Record every words used
+        self.used_words = Used_Words(game_word_list) # Record every words used
+        self.custom_agents = {} # The custom agent of each player, made once per game
+        self.agent_errors = {} # Why each custom agent that failed or made a move that cannot be played resigned, by player name
         self.board_length = length # Current length of the board
         self.board = Board() # Ini the game board
         self.board.create_board(length) # Create the game board
@@ -1145,8 +2887,14 @@ class Game:
         self.first_turn = False # Check for the first turn
         self.paths_full = False # Check for full paths
         self.winner = None # Winner of the current game
+        self.winner_index = None # The winner's position in the player list
         self.draw = False # Draw state
         self.replay_info = [{"game_number": starting_counter, "board_length": length}] # The contents of the replay
+        self.start_time = None # When the game started
+        self.play_again = False # Whether the players want another game after this one
+
+        if self.headless:
+            self.board.renderer = Board_Renderer(False)
 
     def end_game_summary(self) -> None:
         """Display summary of a recently finished game."""
@@ -1201,11 +2949,11 @@ class Game:
                         f.write(f"\n\n{player['name']} ({player['difficulty']})\nWINS: {player['stats']['wins']} LOSES: {player['stats']['loses']} DRAWS: {player['stats']['draws']}")
 
                 f.close()
-                main()
+                return
             elif user_input == "N":
-                main()
+                return
             else:
-                self.end_game_summary()
+                return self.end_game_summary()
 
     def end_game_display(self, time=1) -> None:
         """Display title and board of a recently finished game."""
@@ -1218,23 +2966,31 @@ class Game:
             self.board.display_game_title(False, True)
             self.board.display_board()
 
+        # Show why each custom agent that failed resigned, so its developer can fix it
+        for name, error in self.agent_errors.items():
+            print(Fore.RED + Style.BRIGHT + f"{name} resigned because of an error:\n{error.rstrip()}\n")
+
     def ask_play_again(self) -> None:
         """Ask the player to play again."""
         self.end_game_display(0)
         user_input = input("Play again? Y/N: ").upper()
 
         if user_input == "Y":
-            if len(self.players_list) == 2:
-                Game(self.board.game_counter + 1, self.board_length, list(reversed(self.players_list))).run()
-            elif len(self.players_list) > 2:
-                shifted_player = self.players_list.pop()
-                self.players_list.insert(0, shifted_player)
-                Game(self.board.game_counter + 1, self.board_length, self.players_list).run()
+            self.play_again = True
         elif user_input == "N":
-            self.end_game_summary()
+            self.play_again = False
         else:
             self.ask_play_again()
 
+    def get_next_players(self) -> List[Dict[str, Any]]:
+        """Get the players for the next game, the first player moves to the back."""
+        if len(self.players_list) == 2:
+            return list(reversed(self.players_list))
+        else:
+            shifted_player = self.players_list.pop()
+            self.players_list.insert(0, shifted_player)
+            return self.players_list
+
     def save_replay(self, time=0) -> None:
         """Save a recently finished game."""
         self.end_game_display(time)
@@ -1253,13 +3009,9 @@ class Game:
                     raise
 
             # Create the file
-            file = open(f"{LOCAL_DIR_REPLAYS}{filename}{REPLAY_FILE_FORMAT}", 'w')
-            file_content = bytes(str(self.replay_info), 'utf-8')
-
-            for byte in file_content:
-                file.write(f"{byte}\n")
+            with open(f"{LOCAL_DIR_REPLAYS}{filename}{REPLAY_FILE_FORMAT}", 'wb') as file:
+                write_replay(file, self.replay_info)
 
-            file.close()
             self.ask_play_again()
 
     def write_replay_file(self) -> None:
@@ -1274,28 +3026,26 @@ class Game:
         # Create the file
         file_title = " VS ".join([f"{i['name']} ({i['difficulty']})" if i['difficulty'] is not None else f"{i['name']}" for i in self.players_list]) + f" [{self.board_length}x{self.board_length}]"
         i = 1
-        file_name = f"{LOCAL_DIR_REPLAYS}{file_title} {i}{REPLAY_FILE_FORMAT}"
 
-        while os.path.exists(file_name):
-            file_name = f"{LOCAL_DIR_REPLAYS}{file_title} {i}{REPLAY_FILE_FORMAT}"
-            i += 1
-
-        file = open(file_name, 'w')
-        file_content = bytes(str(self.replay_info), 'utf-8')
-
-        for byte in file_content:
-            file.write(f"{byte}\n")
-
-        file.close()
+        # Create the file exclusively so simulation workers never write to the same file
+        while True:
+            try:
+                file = open(f"{LOCAL_DIR_REPLAYS}{file_title} {i}{REPLAY_FILE_FORMAT}", 'xb')
+                break
+            except FileExistsError:
+                i += 1
 
-        if self.total_game_number > 1:
-            Game(self.board.game_counter + 1, self.board_length, self.players_list, self.total_game_number - 1, True).run()
-        else:
-            self.end_game_summary()
+        with file:
+            write_replay(file, self.replay_info)
 
     def end_game_event(self, time=1) -> None:
         """Trigger the end game event."""
-        if self.sim:
+        self.update_game_duration()
+
+        if self.headless:
+            if self.write_replays:
+                self.write_replay_file()
+        elif self.sim:
             self.write_replay_file()
         else:
             self.end_game_display(time)
@@ -1339,7 +3089,7 @@ class Game:
         common_letters = []
 
         for coord in self.board.selected_path:
-            common_letters.append(self.board.matrix[coord])
+            common_letters.append(self.board.get_letter(coord))
 
         # Get word from player
         word = input(Fore.WHITE + Style.BRIGHT + f"Enter word with length of {path_length}: ").upper()
@@ -1368,7 +3118,7 @@ class Game:
                 return self.get_word()
             elif len(word) == path_length:
                 # Check if word exist in game word list
-                if word not in game_word_list[len(word)]:
+                if not game_word_list.is_word(word):
                     self.board.display_selected_path()
                     print(Fore.WHITE + Style.BRIGHT + f"Enter word with length of {path_length}: " + Fore.RED + Style.BRIGHT + "That's not a word!")
                     self.board.display_selected_path(1)
@@ -1380,30 +3130,12 @@ class Game:
                     self.board.display_selected_path(1)
                     return self.get_word()
                 else:
-                    # Scan the path to get the letters
-                    scanned_common_letters = common_letters
-
-                    for i in range(len(scanned_common_letters)):
-                        if scanned_common_letters[i] == " ":
-                            scanned_common_letters.remove(scanned_common_letters[i])
-                            scanned_common_letters.insert(i, word[i])
-
-                    # Form the scanned word
-                    scanned_word = ''.join(scanned_common_letters)
-
-                    # If the letters of the player's word is in the scanned word
-                    if word in scanned_word:
-                        # If the scanned word is in the game word list
-                        if scanned_word in game_word_list[path_length]:
-                            self.board.place_word(word)
-                            self.used_words.append(word)
-                            self.board.used_words = self.used_words
-                        else:
-                            self.board.display_selected_path()
-                            print(Fore.WHITE + Style.BRIGHT + f"Enter word with length of {path_length}: " + Fore.RED + Style.BRIGHT + "word not in order with the selected path!")
-                            self.board.display_selected_path(1)
-                            return self.get_word()
-                    elif word in game_word_list[path_length]:
+                    # If the letters already on the selected path are in the player's word
+                    if game_word_list.fits_pattern(word, ''.join(common_letters)):
+                        self.board.place_word(word)
+                        self.used_words.append(word)
+                        self.board.used_words = self.used_words
+                    else:
                         self.board.display_selected_path()
                         print(Fore.WHITE + Style.BRIGHT + f"Enter word with length of {path_length}: " + Fore.RED + Style.BRIGHT + "word not in order with the selected path!")
                         self.board.display_selected_path(1)
@@ -1412,7 +3144,13 @@ class Game:
     def turn_handler(self, computer_player=None) -> int:
         """Handle the turns for each player."""
         # This is to make sure it does print the game twice on the same screen
-        if self.first_turn or self.paths_full:
+        if self.headless:
+            pass
+        elif computer_player is not None:
+            # The turn of a computer player is drawn over the last screen, only what changed is drawn again
+            time.sleep(1 if self.first_turn or self.paths_full else 0)
+            self.board.refresh_screen(self.board.get_game_title())
+        elif self.first_turn or self.paths_full:
             clear_screen()
         else:
             clear_screen(0)
@@ -1450,8 +3188,6 @@ class Game:
             else:
                 return self.turn_handler()
         else:
-            self.board.display_game_title()
-            self.board.display_board()
             computer_player.play()
 
             if computer_player.draw_detected:
@@ -1464,10 +3200,86 @@ class Game:
                 else:
                     return 0
 
+    def custom_agent_turn(self, player: Dict[str, Any]) -> int:
+        """Let an custom agent choose its move from an observation of the game, return 0 if it resigns or its move cannot be played."""
+        if not self.headless:
+            self.board.refresh_screen(self.board.get_game_title())
+
+        if self.board.empty_cells == 0:
+            self.draw_event()
+            return 1
+
+        # An agent that fails resigns, so a bug in it cannot stop the game. The traceback is kept so the developer can see what went wrong
+        try:
+            if player['name'] not in self.custom_agents:
+                self.custom_agents[player['name']] = load_agent_class(player['agent'])()
+
+            move = self.custom_agents[player['name']].choose_move(Observation(self.board, self.used_words, player['name']))
+        except Exception:
+            self.agent_errors[player['name']] = traceback.format_exc()
+            return 0
+
+        if move is None:
+            return 0
+
+        try:
+            path, word = self.check_agent_move(move)
+        except ValueError as e:
+            self.agent_errors[player['name']] = f"choose_move returned {move!r}, which cannot be played: {e}"
+            return 0
+
+        self.board.selected_path = path
+        self.board.place_word(word)
+        self.used_words.append(word)
+        return 1
+
+    def check_agent_move(self, move: Any) -> Tuple[Tuple[Tuple[int, int], ...], str]:
+        """Check that the move of an custom agent is one a human player could make, return its path and word. Raise ValueError naming the problem if it is not."""
+        try:
+            selected_path, word = move
+        except (TypeError, ValueError):
+            raise ValueError("a move must be a (path, word) pair or None")
+
+        try:
+            path = tuple(tuple(int(n) for n in coord) for coord in selected_path)
+        except (TypeError, ValueError):
+            raise ValueError("the path must be a sequence of (row, column) cells")
+
+        word = str(word).upper()
+
+        if not path:
+            raise ValueError("the path is empty")
+        elif path[0] not in get_path_table(self.board_length).paths or path not in get_start_paths(self.board_length, path[0]):
+            raise ValueError(f"the path is not one of the paths of the {self.board_length}x{self.board_length} board")
+
+        pattern = ''.join(self.board.get_letter(coord) for coord in path)
+
+        if " " not in pattern:
+            raise ValueError("the path has no empty cell")
+        elif not Lexicon.fits_pattern(word, pattern):
+            raise ValueError(f"{word} does not fit the letters already on the path")
+        elif not game_word_list.is_word(word):
+            raise ValueError(f"{word} is not a word")
+        elif word in self.used_words:
+            raise ValueError(f"{word} has already been used")
+
+        return path, word
+
+    def get_game_record(self) -> Dict[str, Any]:
+        """Get the result of a finished game."""
+        return {"game_number": self.board.game_counter, "board_length": self.board_length, "winner": self.winner, "winner_index": self.winner_index, "draw": self.draw, "turns": self.board.turn_counter, "game_duration": self.board.game_duration, "agent_errors": dict(self.agent_errors)}
+
+    def update_game_duration(self) -> None:
+        """Record how long the game has been running."""
+        elapsed_time = int(time.time() - self.start_time)
+        game_duration = time.strftime("%H:%M:%S", time.gmtime(elapsed_time))
+        self.board.game_duration = game_duration
+        self.replay_info[0]['game_duration'] = game_duration
+
     def run(self) -> None:
         """Run the game."""
         current_players = self.players_list.copy()
-        start_time = time.time()
+        self.start_time = time.time()
 
         while True:
             # Check for a winner
@@ -1479,6 +3291,7 @@ class Game:
 
                 winner = current_players[0]
                 winner['stats']['wins'] += 1
+                self.winner_index = self.players_list.index(winner)
 
                 if winner['type'] == 'human':
                     self.replay_info.append({"player_name": winner['name'], "type": winner['type'], "difficulty": None, "event": "WON", "selected_path": None, "word": None})
@@ -1486,6 +3299,7 @@ class Game:
                     self.replay_info.append({"player_name": winner['name'], "type": winner['type'], "difficulty": winner['difficulty'], "event": "WON", "selected_path": None, "word": None})
 
                 self.win_event()
+                return
 
             # Handle the turns for each player
             for player in current_players:
@@ -1494,6 +3308,9 @@ class Game:
                     self.board.player = f"{player['name']}"
                     player_turn = self.turn_handler()
 
+                    if self.draw:
+                        return
+
                     if player_turn == 0: # Do not add this statement to the computer player as the computer player never resigns on the first turn
                         if not self.first_turn:
                             self.first_turn = True
@@ -1501,50 +3318,48 @@ class Game:
                         current_players.pop(current_players.index(player))
                         player['stats']['loses'] += 1
                         self.replay_info.append({"player_name": player['name'], "type": player['type'], "difficulty": None, "event": "RESIGNED", "selected_path": None, "word": None})
-                        clear_screen(0)
-                        self.board.display_game_title(False, False, True)
-                        self.board.display_board()
+                        self.board.refresh_screen(self.board.get_game_title(has_resigned=True))
                         break # Do not delete this as it handles the skips of indexing when iterating an modified list
                     else:
                         self.board.previous_player = player['name']
                         self.replay_info.append({"player_name": player['name'], "type": player['type'], "difficulty": None, "event": "PLAYING", "selected_path": self.board.selected_path, "word": self.board.word})
                         self.board.turn_counter += 1
                 else:
+                    # Setup the computer player
+                    self.board.player = f"{player['name']} ({player['difficulty']})"
+
                     if player['make'] == "official":
-                        # Setup the computer player
-                        self.board.player = f"{player['name']} ({player['difficulty']})"
-                        computer_player = Official_Agent()
+                        computer_player = {"MCTS": MCTS_Agent, "SOLVER": Solver_Agent}.get(player['difficulty'], Official_Agent)()
                         computer_player.agent_name = player['name']
                         computer_player.difficulty = player['difficulty']
                         computer_player.board_length = self.board_length
-                        computer_player.analyse_board = copy.deepcopy(self.board)
+                        computer_player.analyse_board = self.board.copy()
                         computer_player.analyse_used_words = self.used_words.copy()
+                        computer_player.headless = self.headless
+                        computer_player.time_budget = player.get('time_budget', AGENT_TIME_BUDGET)
                         player_turn = self.turn_handler(computer_player)
+                    else:
+                        player_turn = self.custom_agent_turn(player)
 
-                        if player_turn == 0:
-                            self.removed_players.append(player)
-                            current_players.pop(current_players.index(player))
-                            player['stats']['loses'] += 1
-                            self.replay_info.append({"player_name": player['name'], "type": player['type'], "difficulty": player['difficulty'], "event": "RESIGNED", "selected_path": None, "word": None})
-                            clear_screen(0) # Do not delete!
-                            self.board.display_game_title(False, False, True) # Do not delete!
-                            self.board.display_board() # Do not delete!
-                            clear_screen(1.5)
-                            self.board.display_game_title(False, False, True)
-                            self.board.display_board()
-                            break # Do not delete this as it handles the skips of indexing when iterating an modified list
-                        else:
-                            self.board.previous_player = f"{player['name']} ({player['difficulty']})"
-                            self.replay_info.append({"player_name": player['name'], "type": player['type'], "difficulty": player['difficulty'], "event": "PLAYING", "selected_path": self.board.selected_path, "word": self.board.word})
-                            self.board.turn_counter += 1
+                    if self.draw:
+                        return
+                    elif player_turn == 0:
+                        self.removed_players.append(player)
+                        current_players.pop(current_players.index(player))
+                        player['stats']['loses'] += 1
+                        self.replay_info.append({"player_name": player['name'], "type": player['type'], "difficulty": player['difficulty'], "event": "RESIGNED", "selected_path": None, "word": None})
+
+                        if not self.headless:
+                            self.board.refresh_screen(self.board.get_game_title(has_resigned=True))
+                            time.sleep(1.5)
+
+                        break # Do not delete this as it handles the skips of indexing when iterating an modified list
                     else:
-                        # Ini the custom agent here
-                        pass
+                        self.board.previous_player = f"{player['name']} ({player['difficulty']})"
+                        self.replay_info.append({"player_name": player['name'], "type": player['type'], "difficulty": player['difficulty'], "event": "PLAYING", "selected_path": self.board.selected_path, "word": self.board.word})
+                        self.board.turn_counter += 1
 
-            elapsed_time = int(time.time() - start_time)
-            game_duration = time.strftime("%H:%M:%S", time.gmtime(elapsed_time))
-            self.board.game_duration = game_duration
-            self.replay_info[0]['game_duration'] = game_duration
+            self.update_game_duration()
 
 class Player:
     """Create an player object."""
@@ -1554,7 +3369,7 @@ class Player:
     def get_difficulty(self, name: str) -> str:
         """Set difficulty of the computer player."""
         clear_screen(0)
-        print(Fore.WHITE + Style.BRIGHT + f"Set difficulty for {name}\n[1] Easy\n[2] Medium\n[3] Hard\n[4] Go back to main menu\n")
+        print(Fore.WHITE + Style.BRIGHT + f"Set difficulty for {name}\n[1] Easy\n[2] Medium\n[3] Hard\n[4] MCTS\n[5] Solver\n[6] Go back to main menu\n")
 
         try:
             selection = int(input((Fore.WHITE + Style.BRIGHT + "Selection: ")))
@@ -1565,12 +3380,53 @@ class Player:
             elif selection == 3:
                 return "HARD"
             elif selection == 4:
+                return "MCTS"
+            elif selection == 5:
+                return "SOLVER"
+            elif selection == 6:
                 main()
             else:
                 return self.get_difficulty(name)
         except ValueError:
             return self.get_difficulty(name)
 
+    def get_time_budget(self, name: str) -> Optional[float]:
+        """Get how many seconds the computer player thinks about each move, None runs a fixed number of rollouts."""
+        clear_screen(0)
+        label = f"Milliseconds {name} thinks about each move (leave empty for {'a fixed number of rollouts' if AGENT_TIME_BUDGET is None else AGENT_TIME_BUDGET * 1000}): "
+        time_budget = input(Fore.WHITE + Style.BRIGHT + label)
+
+        if time_budget == "":
+            return AGENT_TIME_BUDGET
+
+        try:
+            time_budget = float(time_budget)
+        except ValueError:
+            time_budget = 0
+
+        if not time_budget > 0:
+            clear_screen(0)
+            print(Fore.WHITE + Style.BRIGHT + label + Fore.RED + Style.BRIGHT + "Time budget must be more than 0!")
+            clear_screen()
+            return self.get_time_budget(name)
+
+        return time_budget / 1000
+
+    def get_agent(self, name: str) -> str:
+        """Get the module and class of an custom agent."""
+        clear_screen(0)
+        agent = input(Fore.WHITE + Style.BRIGHT + f"Agent for {name} as MODULE:CLASS (leave empty for Custom_Agent in this file): ")
+
+        try:
+            load_agent_class(agent)
+        except (ImportError, OSError, AttributeError, TypeError) as e:
+            clear_screen(0)
+            print(Fore.WHITE + Style.BRIGHT + f"Agent for {name} as MODULE:CLASS (leave empty for Custom_Agent in this file): " + Fore.RED + Style.BRIGHT + f"Cannot load the agent! ({e})")
+            clear_screen()
+            return self.get_agent(name)
+
+        return agent
+
     def get_player_name(self) -> str:
         """Get name from human players."""
         player_name = input(Fore.WHITE + Style.BRIGHT + f"Enter your name (max characters is {CHAR_LIMIT}): ")
@@ -1600,14 +3456,14 @@ class Player:
 
         if user_input == "Y":
             if n is None:
-                self.players.append({"name": f"{CUSTOM_COMPUTER_PLAYER_NAME}", "type": "computer","difficulty": self.get_difficulty(f"{CUSTOM_COMPUTER_PLAYER_NAME}"), "stats": {"wins": 0, "loses": 0, "draws": 0}, "make": "unofficial"})
+                self.players.append({"name": f"{CUSTOM_COMPUTER_PLAYER_NAME}", "type": "computer","difficulty": "CUSTOM", "stats": {"wins": 0, "loses": 0, "draws": 0}, "make": "unofficial", "agent": self.get_agent(f"{CUSTOM_COMPUTER_PLAYER_NAME}")})
             else:
-                self.players.append({"name": f"{CUSTOM_COMPUTER_PLAYER_NAME} {n}", "type": "computer", "difficulty": self.get_difficulty(f"{CUSTOM_COMPUTER_PLAYER_NAME} {n}"), "stats": {"wins": 0, "loses": 0, "draws": 0}, "make": "unofficial"})
+                self.players.append({"name": f"{CUSTOM_COMPUTER_PLAYER_NAME} {n}", "type": "computer", "difficulty": "CUSTOM", "stats": {"wins": 0, "loses": 0, "draws": 0}, "make": "unofficial", "agent": self.get_agent(f"{CUSTOM_COMPUTER_PLAYER_NAME} {n}")})
         elif user_input == "N":
             if n is None:
-                self.players.append({"name": f"{COMPUTER_PLAYER_NAME}", "type": "computer","difficulty": self.get_difficulty(f"{COMPUTER_PLAYER_NAME}"),"stats": {"wins": 0, "loses": 0, "draws": 0}, "make": "official"})
+                self.players.append({"name": f"{COMPUTER_PLAYER_NAME}", "type": "computer","difficulty": self.get_difficulty(f"{COMPUTER_PLAYER_NAME}"),"stats": {"wins": 0, "loses": 0, "draws": 0}, "make": "official", "time_budget": self.get_time_budget(f"{COMPUTER_PLAYER_NAME}")})
             else:
-                self.players.append({"name": f"{COMPUTER_PLAYER_NAME} {n}", "type": "computer", "difficulty": self.get_difficulty(f"{COMPUTER_PLAYER_NAME} {n}"), "stats": {"wins": 0, "loses": 0, "draws": 0}, "make": "official"})
+                self.players.append({"name": f"{COMPUTER_PLAYER_NAME} {n}", "type": "computer", "difficulty": self.get_difficulty(f"{COMPUTER_PLAYER_NAME} {n}"), "stats": {"wins": 0, "loses": 0, "draws": 0}, "make": "official", "time_budget": self.get_time_budget(f"{COMPUTER_PLAYER_NAME} {n}")})
         else:
             self.ask_if_custom_agent(n)
 
@@ -1645,6 +3501,438 @@ class Player:
             clear_screen()
             return self.get_players(vs_computer, self_play)
 
+def create_agent_players(agents: List[str], time_budget=AGENT_TIME_BUDGET) -> List[Dict[str, Any]]:
+    """Create a list of agents, each agent is a difficulty, a name and a difficulty such as "Alice:HARD" or a name and an custom agent such as "Bob=agents.py:Greedy".
+    Every official agent thinks for the time budget in seconds on each move, or runs a fixed number of rollouts if it is None."""
+    players = []
+
+    for n, agent in enumerate(agents, 1):
+        # The names are written to the replays and their file names, so they are held to the limit of the human player names
+        if len(agent.partition("=")[0] if "=" in agent else agent.rpartition(":")[0]) > CHAR_LIMIT:
+            raise ValueError(f"The name of {agent} cannot exceed {CHAR_LIMIT} characters!")
+
+        if "=" in agent:
+            name, _, agent = agent.partition("=")
+
+            try:
+                load_agent_class(agent)
+            except (ImportError, OSError, AttributeError, TypeError) as e:
+                raise ValueError(f"Cannot load the custom agent {agent} ({e})")
+
+            players.append({"name": name or f"{COMPUTER_PLAYER_NAME} {n}", "type": "computer", "difficulty": "CUSTOM", "stats": {"wins": 0, "loses": 0, "draws": 0}, "make": "unofficial", "agent": agent})
+            continue
+
+        name, _, difficulty = agent.rpartition(":")
+
+        if difficulty.upper() not in DIFFICULTIES:
+            raise ValueError(f"Unknown difficulty {difficulty}, must be one of {', '.join(DIFFICULTIES)}")
+
+        players.append({"name": name or f"{COMPUTER_PLAYER_NAME} {n}", "type": "computer", "difficulty": difficulty.upper(), "stats": {"wins": 0, "loses": 0, "draws": 0}, "make": "official", "time_budget": time_budget})
+
+    return players
+
+
+def play_games(board_length: int, players: List[Dict[str, Any]], total_game_number=0, sim=False) -> None:
+    """Play games one after another until the players stop or every simulated game has been played."""
+    game_number = 1
+
+    # Each game returns when it ends, so a long run keeps the same stack depth and only one game in memory
+    while True:
+        game = Game(game_number, board_length, players, total_game_number - game_number + 1, sim)
+        game.run()
+
+        if sim and game_number >= total_game_number or not sim and not game.play_again:
+            game.end_game_summary()
+            return
+        elif not sim:
+            players = game.get_next_players()
+
+        game_number += 1
+
+
+def simulate_games(board_length: int, players: List[Dict[str, Any]], game_numbers: range, total_game_number: int, write_replays=False, seed=None, encode_replays=False, lexicon_backend=LEXICON_BACKEND) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Simulate some of the games of a run, return the players with their stats and the result of every game. An encoded replay is added to each result if asked."""
+    set_lexicon_backend(lexicon_backend)
+    load_word_lists()
+    results = []
+
+    for game_number in game_numbers:
+        # Seed every game on its own so the results do not depend on which process played it
+        if seed is not None:
+            random.seed(f"{seed}:{game_number}")
+            get_transposition_table.cache_clear()
+            get_solver.cache_clear()
+
+        game = Game(game_number, board_length, players, total_game_number - game_number + 1, True, True, write_replays)
+        game.run()
+        results.append(game.get_game_record())
+
+        if encode_replays:
+            results[-1]['replay'] = encode_replay(game.replay_info)
+
+    return players, results
+
+
+def simulate(board_length: int, agents: List[str], games: int, output_path=None, write_replays=False, seed=None, workers=1, archive=None, time_budget=AGENT_TIME_BUDGET, lexicon_backend=LEXICON_BACKEND) -> List[Dict[str, Any]]:
+    """Simulate games between official and custom agents without rendering, sleeping or asking for input. Return the players with their stats.
+    If an archive name is given, every game is appended to that replay archive instead of being written to its own file.
+    A custom agent that failed in some games also gets how many in failed_games and the error of the first in first_error."""
+    if not LOWER_LIMIT <= board_length <= UPPER_LIMIT:
+        raise ValueError(f"Board length must be between {LOWER_LIMIT} and {UPPER_LIMIT}")
+
+    if time_budget is not None and time_budget <= 0:
+        raise ValueError("Time budget must be more than 0")
+
+    set_lexicon_backend(lexicon_backend)
+
+    players = create_agent_players(agents, time_budget)
+
+    if len(players) < 2:
+        raise ValueError("Must have at least two players!")
+
+    # Compile any lexicon that is missing or out of date here, so the workers only map the files instead of all compiling them at once
+    load_word_lists()
+
+    if archive is not None:
+        archive = Replay_Archive(archive)
+        archive.open([(player['name'], player['type'], player['difficulty']) for player in players])
+        write_replays = False
+
+    # Split the games into chunks, several per worker so a slow chunk does not hold up the others
+    chunk_size = min(SIMULATION_CHUNK_SIZE, max(1, -(-games // (workers * 4))))
+    chunks = [range(start, min(start + chunk_size, games + 1)) for start in range(1, games + 1, chunk_size)]
+    chunk_arguments = [(board_length, [{**player, "stats": {"wins": 0, "loses": 0, "draws": 0}} for player in players], chunk, games, write_replays, seed, archive is not None, lexicon_backend) for chunk in chunks]
+    results = []
+
+    with ProcessPoolExecutor(workers) if workers > 1 else contextlib.nullcontext() as executor:
+        if executor is None:
+            chunk_outputs = (simulate_games(*arguments) for arguments in chunk_arguments)
+        else:
+            chunk_outputs = (future.result() for future in [executor.submit(simulate_games, *arguments) for arguments in chunk_arguments])
+
+        # Merge each chunk in game order, so the archive and the results are the same however many workers there are
+        for chunk_players, chunk_results in chunk_outputs:
+            for player, chunk_player in zip(players, chunk_players):
+                for stat in player['stats']:
+                    player['stats'][stat] += chunk_player['stats'][stat]
+
+            for game_record in chunk_results:
+                if archive is not None:
+                    archive.append(game_record.pop('replay'), game_record)
+
+                # Every error is in the results, the players only keep the first so it can be reported
+                for player in players:
+                    if player['name'] in game_record['agent_errors']:
+                        player['failed_games'] = player.get('failed_games', 0) + 1
+                        player.setdefault('first_error', game_record['agent_errors'][player['name']])
+
+                results.append(game_record)
+
+    if output_path is not None:
+        with open(output_path, 'w') as f:
+            json.dump({"board_length": board_length, "games": games, "seed": seed, "players": players, "results": results}, f, indent=4)
+
+    return players
+
+
+def search_opening(board_length: int, difficulty: str, moves: List[Tuple[str, Tuple[Tuple[int, int], ...]]], iterations: int, seed=None) -> Optional[Tuple[str, Tuple[Tuple[int, int], ...]]]:
+    """Search the position after the moves with MCTS and the vocabulary of the difficulty, return the move found or None if there is none."""
+    load_word_lists()
+
+    if seed is not None:
+        random.seed(f"{seed}:{board_length}:{difficulty}:{moves}")
+        get_transposition_table.cache_clear()
+
+    board = Board()
+    board.create_board(board_length)
+    board.used_words = Used_Words(game_word_list)
+
+    for word, path in moves:
+        board.make_move(path, word)
+
+    agent = MCTS_Agent()
+    agent.agent_name = "Opening book"
+    agent.difficulty = difficulty
+    agent.board_length = board_length
+    agent.analyse_board = board
+    agent.analyse_used_words = board.used_words
+    agent.headless = True
+    agent.use_book = False
+    agent.iterations = iterations
+    agent.play()
+
+    if agent.final_selected_word is None:
+        return None
+
+    return agent.final_selected_word, agent.final_selected_path
+
+
+def build_opening_book(board_lengths: List[int], difficulties: List[str], iterations=BOOK_ITERATIONS, seed=None, workers=1) -> Opening_Book:
+    """Work out the first move of each board length and vocabulary and the reply of each vocabulary to those first moves, then add them to the opening book file."""
+    load_word_lists()
+    book = Opening_Book.load(BOOK_FILE)
+
+    with ProcessPoolExecutor(workers) if workers > 1 else contextlib.nullcontext() as executor:
+        def search(jobs: List[Tuple[Any, ...]]) -> List[Optional[Tuple[str, Tuple[Tuple[int, int], ...]]]]:
+            if executor is None:
+                return [search_opening(*job) for job in jobs]
+            else:
+                return [future.result() for future in [executor.submit(search_opening, *job) for job in jobs]]
+
+        first_jobs = [(board_length, difficulty, [], iterations, seed) for board_length in board_lengths for difficulty in difficulties]
+        first_moves = search(first_jobs)
+
+        # Each vocabulary replies to the first move of every vocabulary, as an agent may play against any of them
+        reply_jobs = [(job[0], difficulty, [first_move], iterations, seed) for job, first_move in zip(first_jobs, first_moves) if first_move is not None for difficulty in difficulties]
+        replies = search(reply_jobs)
+
+    for (board_length, difficulty, moves, *_), move in zip(first_jobs + reply_jobs, first_moves + replies):
+        if move is not None:
+            board = Board()
+            board.create_board(board_length)
+            board.used_words = Used_Words(game_word_list)
+
+            for word, path in moves:
+                board.make_move(path, word)
+
+            book.add(board, get_vocabulary(difficulty), move)
+
+    book.save(BOOK_FILE)
+    return book
+
+
+def rate_moves(replay_info: List[Dict[str, Any]], solver: Solver, empty_cells=SOLVER_EMPTY_CELLS) -> Dict[str, Dict[str, int]]:
+    """Check every move of a two player game with at most empty_cells empty cells against the solver. Return how many moves each player made,
+    how many of them could be solved and how many of those gave away a better outcome."""
+    board = Board()
+    board.create_board(replay_info[0]['board_length'])
+    board.used_words = Used_Words(game_word_list)
+    ratings = {}
+
+    for event in replay_info[1:]:
+        if event['event'] != "PLAYING":
+            continue
+
+        player_name = event['player_name'] if event['difficulty'] is None else f"{event['player_name']} ({event['difficulty']})"
+        rating = ratings.setdefault(player_name, {"moves": 0, "solved": 0, "mistakes": 0})
+        rating['moves'] += 1
+
+        # Earlier positions are too big to solve, so they are not searched at all
+        best = solver.evaluate(board) if board.empty_cells <= empty_cells else None
+        board.make_move(tuple(tuple(cell) for cell in event['selected_path']), event['word'])
+
+        if best is not None:
+            played = solver.evaluate(board)
+
+            if played is not None:
+                rating['solved'] += 1
+                rating['mistakes'] += -played < best
+
+    return ratings
+
+
+def analyse_replays(replays: List[Tuple[str, int, Optional[int]]]) -> Replay_Stats:
+    """Gather the stats of some replays. Each is a file, where the game starts in it and its size, the size is None if the game is the whole file."""
+    stats = Replay_Stats()
+
+    for file_name, offset, size in replays:
+        try:
+            if size is None and not is_binary_replay(file_name):
+                replay_info = read_legacy_replay(file_name)
+                stats.add_game(replay_info[0], iter(replay_info[1:]))
+                continue
+
+            # The events are read and counted a chunk at a time, the whole game is never held in memory
+            with open(file_name, 'rb') as f:
+                f.seek(offset)
+                reader = Replay_Reader(f if size is None else io.BytesIO(f.read(size)))
+                stats.add_game(reader.game_info, reader.events())
+        except (OSError, KeyError, IndexError, ValueError, SyntaxError, EOFError, struct.error, zlib.error, lzma.LZMAError) as e:
+            stats.skipped.append(f"{file_name}{'' if size is None else f' (game at byte {offset})'}: cannot be read ({e})")
+
+    return stats
+
+
+def analyse(files=None, output_path=None, workers=1, top=ANALYSIS_TOP_WORDS) -> Replay_Stats:
+    """Gather the stats of replay files and archives on several processes, every one in the Replays folder if no files are given.
+    The tables are written to the output as JSON, or as one CSV file per table if the output ends in .csv."""
+    if files is None:
+        files = [f"{LOCAL_DIR_REPLAYS}{file}" for file in sorted(os.listdir(LOCAL_DIR_REPLAYS)) if file.endswith((REPLAY_FILE_FORMAT, REPLAY_ARCHIVE_FORMAT))] if os.path.isdir(LOCAL_DIR_REPLAYS) else []
+
+    stats = Replay_Stats()
+    replays = []
+
+    # Only where each game is goes to the workers, the archives are split into their games so they are shared out too
+    for file in files:
+        if file.endswith(REPLAY_ARCHIVE_FORMAT):
+            archive = Replay_Archive(os.path.basename(file)[:-len(REPLAY_ARCHIVE_FORMAT)], os.path.join(os.path.dirname(file), ""))
+
+            try:
+                archive.open()
+                replays += [(archive.archive_file, offset, size) for offset, size in archive.get_games()]
+            except (OSError, ValueError) as e:
+                stats.skipped.append(f"{file}: cannot be read ({e})")
+        else:
+            replays.append((file, 0, None))
+
+    # Split the replays into chunks, several per worker so a slow chunk does not hold up the others
+    chunk_size = min(ANALYSIS_CHUNK_SIZE, max(1, -(-len(replays) // (workers * 4))))
+    chunks = [replays[start:start + chunk_size] for start in range(0, len(replays), chunk_size)]
+
+    with ProcessPoolExecutor(workers) if workers > 1 else contextlib.nullcontext() as executor:
+        # The chunks are merged in order as they finish, so the stats are the same however many workers there are
+        for chunk_stats in map(analyse_replays, chunks) if executor is None else executor.map(analyse_replays, chunks):
+            stats.merge(chunk_stats)
+
+    if output_path is not None:
+        tables = stats.get_tables(top)
+
+        if output_path.endswith(".csv"):
+            for name, rows in tables.items():
+                with open(f"{output_path[:-len('.csv')]}_{name}.csv", 'w', newline='') as f:
+                    writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else [])
+                    writer.writeheader()
+                    writer.writerows(rows)
+        else:
+            with open(output_path, 'w') as f:
+                json.dump({"games": stats.games, **tables, "skipped": stats.skipped}, f, indent=4)
+
+    return stats
+
+
+def command_line(arguments: List[str]) -> None:
+    """Run the program from the command line without the menus."""
+    parser = argparse.ArgumentParser(prog=os.path.basename(__file__), description=f"{__title__} v{__version__}")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    simulate_parser = subparsers.add_parser('simulate', help="simulate games between official agents without rendering")
+    simulate_parser.add_argument('-l', '--board-length', type=int, required=True, help=f"the board length, between {LOWER_LIMIT} and {UPPER_LIMIT}")
+    simulate_parser.add_argument('-a', '--agents', nargs='+', required=True, help=f"the agents, each is one of {', '.join(DIFFICULTIES)}, NAME:DIFFICULTY or NAME=MODULE:CLASS for an custom agent")
+    simulate_parser.add_argument('-n', '--games', type=int, default=1, help="how many games to simulate")
+    simulate_parser.add_argument('-o', '--output', help="write the stats and the result of every game to this JSON file")
+    simulate_parser.add_argument('-r', '--replays', action='store_true', help=f"write a replay file for every game to {LOCAL_DIR_REPLAYS}")
+    simulate_parser.add_argument('-s', '--seed', type=int, help="seed every game so the run can be repeated")
+    simulate_parser.add_argument('-w', '--workers', type=int, default=1, help="how many processes to simulate on, 0 uses every core")
+    simulate_parser.add_argument('-t', '--time-budget', type=float, help="how many milliseconds each agent thinks about each move, instead of a fixed number of rollouts")
+    simulate_parser.add_argument('--lexicon-backend', choices=LEXICON_BACKENDS, default=LEXICON_BACKEND, help="how the word lists match patterns, bitset looks up one path at a time and mask matches every path of a turn in one go")
+    simulate_parser.add_argument('--archive', help=f"append every game to the replay archive {LOCAL_DIR_REPLAYS}ARCHIVE{REPLAY_ARCHIVE_FORMAT} instead of writing a file per game")
+
+    convert_parser = subparsers.add_parser('convert-replays', help="convert replay files from the old format to the binary format")
+    convert_parser.add_argument('files', nargs='*', help=f"the replay files, every {REPLAY_FILE_FORMAT} file in {LOCAL_DIR_REPLAYS} if none are given")
+    convert_parser.add_argument('-c', '--compression', choices=REPLAY_COMPRESSIONS, default=REPLAY_COMPRESSION, help="how to compress the events")
+
+    solve_parser = subparsers.add_parser('solve', help="check every move of two player replays against the exact outcome of its position")
+    solve_parser.add_argument('files', nargs='*', help=f"the replay files, every {REPLAY_FILE_FORMAT} file in {LOCAL_DIR_REPLAYS} if none are given")
+    solve_parser.add_argument('-v', '--vocabulary', choices=("EASY", "MEDIUM", "HARD"), default="HARD", help="solve with the vocabulary of this difficulty")
+    solve_parser.add_argument('-n', '--nodes', type=int, default=SOLVER_NODE_LIMIT, help="the most positions to search for each move, 0 searches until solved")
+    solve_parser.add_argument('-e', '--empty-cells', type=int, default=SOLVER_EMPTY_CELLS, help="only check moves played with at most this many empty cells on the board")
+
+    book_parser = subparsers.add_parser('build-book', help="work out the opening moves of the official agents ahead of time")
+    book_parser.add_argument('-l', '--board-lengths', type=int, nargs='+', default=list(range(LOWER_LIMIT, UPPER_LIMIT + 1)), help="the board lengths, every length if none are given")
+    book_parser.add_argument('-d', '--difficulties', nargs='+', choices=BOOK_DIFFICULTIES, default=list(BOOK_DIFFICULTIES), help="the vocabularies of these difficulties, every vocabulary if none are given")
+    book_parser.add_argument('-i', '--iterations', type=int, default=BOOK_ITERATIONS, help="how many rollouts to run for each position")
+    book_parser.add_argument('-s', '--seed', type=int, help="seed the search so the book can be built again")
+    book_parser.add_argument('-w', '--workers', type=int, default=1, help="how many processes to search on, 0 uses every core")
+
+    analyse_parser = subparsers.add_parser('analyse', help="gather the stats of many replays without watching them")
+    analyse_parser.add_argument('files', nargs='*', help=f"the replay files and archives, every {REPLAY_FILE_FORMAT} and {REPLAY_ARCHIVE_FORMAT} file in {LOCAL_DIR_REPLAYS} if none are given")
+    analyse_parser.add_argument('-o', '--output', help="write the tables to this JSON file, or to one CSV file per table if it ends in .csv")
+    analyse_parser.add_argument('-w', '--workers', type=int, default=1, help="how many processes to read the replays on, 0 uses every core")
+    analyse_parser.add_argument('-t', '--top', type=int, default=ANALYSIS_TOP_WORDS, help="how many of the most decisive words to list")
+
+    args = parser.parse_args(arguments)
+
+    if args.command == 'simulate':
+        # Only the arguments are reported as usage errors, an error during the simulation keeps its traceback
+        if not LOWER_LIMIT <= args.board_length <= UPPER_LIMIT:
+            parser.error(f"Board length must be between {LOWER_LIMIT} and {UPPER_LIMIT}")
+
+        if args.time_budget is not None and args.time_budget <= 0:
+            parser.error("Time budget must be more than 0")
+
+        try:
+            agent_players = create_agent_players(args.agents)
+        except ValueError as e:
+            parser.error(str(e))
+
+        if len(agent_players) < 2:
+            parser.error("Must have at least two players!")
+
+        start_time = time.time()
+        players = simulate(args.board_length, args.agents, args.games, args.output, args.replays, args.seed, args.workers or os.cpu_count(), args.archive, None if args.time_budget is None else args.time_budget / 1000, args.lexicon_backend)
+        elapsed_time = time.time() - start_time
+        print(" VS ".join([f"{i['name']} ({i['difficulty']})" for i in players]))
+        print(f"Played {args.games} game(s) on an {args.board_length}x{args.board_length} board in {elapsed_time:.1f}s ({args.games / elapsed_time * 60:.0f} games per minute).")
+
+        for player in players:
+            print(f"\n{player['name']} ({player['difficulty']})\nWINS: {player['stats']['wins']} LOSES: {player['stats']['loses']} DRAWS: {player['stats']['draws']}")
+
+            if player.get('failed_games'):
+                print(f"Resigned because of an error in {player['failed_games']} game(s), the first error was:\n{player['first_error'].rstrip()}")
+    elif args.command == 'convert-replays':
+        files = args.files or ([f"{LOCAL_DIR_REPLAYS}{file}" for file in sorted(os.listdir(LOCAL_DIR_REPLAYS)) if file.endswith(REPLAY_FILE_FORMAT)] if os.path.isdir(LOCAL_DIR_REPLAYS) else [])
+        converted = 0
+
+        for file in files:
+            try:
+                converted += convert_replay(file, args.compression)
+            except (OSError, ValueError, SyntaxError) as e:
+                print(f"{file}: cannot be converted ({e})")
+
+        print(f"Converted {converted} of {len(files)} replay file(s).")
+    elif args.command == 'build-book':
+        if any(not LOWER_LIMIT <= board_length <= UPPER_LIMIT for board_length in args.board_lengths):
+            parser.error(f"Board length must be between {LOWER_LIMIT} and {UPPER_LIMIT}")
+
+        start_time = time.time()
+        book = build_opening_book(args.board_lengths, args.difficulties, args.iterations, args.seed, args.workers or os.cpu_count())
+        print(f"The opening book {BOOK_FILE} has {len(book)} move(s), built in {time.time() - start_time:.1f}s.")
+    elif args.command == 'solve':
+        load_word_lists()
+        solver = Solver(get_vocabulary(args.vocabulary), args.nodes or None)
+        files = args.files or ([f"{LOCAL_DIR_REPLAYS}{file}" for file in sorted(os.listdir(LOCAL_DIR_REPLAYS)) if file.endswith(REPLAY_FILE_FORMAT)] if os.path.isdir(LOCAL_DIR_REPLAYS) else [])
+        ratings = {}
+
+        for file in files:
+            try:
+                replay_info = load_replay(file)
+            except (OSError, ValueError, SyntaxError) as e:
+                print(f"{file}: cannot be read ({e})")
+                continue
+
+            # The solver plays both sides, so only two player games can be checked
+            if len({event['player_name'] for event in replay_info[1:]}) != 2:
+                print(f"{file}: not a two player game")
+                continue
+
+            for player_name, rating in rate_moves(replay_info, solver, args.empty_cells).items():
+                total = ratings.setdefault(player_name, dict.fromkeys(rating, 0))
+
+                for stat in rating:
+                    total[stat] += rating[stat]
+
+        for player_name, rating in ratings.items():
+            print(f"\n{player_name}\nMOVES: {rating['moves']} SOLVED: {rating['solved']} MISTAKES: {rating['mistakes']}")
+    elif args.command == 'analyse':
+        start_time = time.time()
+        stats = analyse(args.files or None, args.output, args.workers or os.cpu_count(), args.top)
+        print(f"Analysed {stats.games} game(s) in {time.time() - start_time:.1f}s.")
+
+        for skipped in stats.skipped:
+            print(skipped)
+
+        for name, rows in stats.get_tables(args.top).items():
+            print(f"\n{name.replace('_', ' ').upper()}")
+
+            if rows:
+                # Line up the columns, each is as wide as its longest value
+                widths = [max(len(str(column)), *(len(str(row[column])) for row in rows)) for column in rows[0]]
+                print("  ".join(str(column).upper().ljust(width) for column, width in zip(rows[0], widths)))
+
+                for row in rows:
+                    print("  ".join(str(value).ljust(width) for value, width in zip(row.values(), widths)))
+
+
 def main():
     """The program."""
     # Create title bar
@@ -1661,7 +3949,6 @@ def main():
 
     # Run main menu
     while True:
-        global game_word_list, vocab_1, vocab_2
         clear_screen(0)
         print(Fore.WHITE + Style.BRIGHT + f"{'-' * 32}\n{__title__} v{__version__}\nWritten in Python {PY_VERSION}\nDeveloped by {__author__}\n{'-' * 32}")
         menu_item = ["Play against agent", "Simulate agents", "Watch replays", "View README file", "Exit"]
@@ -1675,27 +3962,23 @@ def main():
             check_if_file_exists('English.txt')
             check_if_file_exists('vocab_1.txt', True)
             check_if_file_exists('vocab_2.txt', True)
-            game_word_list = categorise_word_by_length(open('English.txt').read().splitlines())
-            vocab_1 = categorise_word_by_length(open(f'{LOCAL_DIR_VOCABULARY}vocab_1.txt').read().splitlines())
-            vocab_2 = categorise_word_by_length(open(f'{LOCAL_DIR_VOCABULARY}vocab_2.txt').read().splitlines())
+            load_word_lists()
             clear_screen(0)
             board_length = get_board_length()
             clear_screen(0)
             players = Player().get_players(True, False)
-            Game(1, board_length, players).run()
+            play_games(board_length, players)
         elif selection == "2":
             check_if_file_exists('English.txt')
             check_if_file_exists('vocab_1.txt', True)
             check_if_file_exists('vocab_2.txt', True)
-            game_word_list = categorise_word_by_length(open('English.txt').read().splitlines())
-            vocab_1 = categorise_word_by_length(open(f'{LOCAL_DIR_VOCABULARY}vocab_1.txt').read().splitlines())
-            vocab_2 = categorise_word_by_length(open(f'{LOCAL_DIR_VOCABULARY}vocab_2.txt').read().splitlines())
+            load_word_lists()
             clear_screen(0)
             board_length = get_board_length()
             clear_screen(0)
             players = Player().get_players(False, True)
             total_game_number = get_how_many_games()
-            Game(1, board_length, players, total_game_number, True).run()
+            play_games(board_length, players, total_game_number, True)
         elif selection == "3":
             clear_screen(0)
             open_replay()
@@ -1707,4 +3990,7 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1:
+        command_line(sys.argv[1:])
+    else:
+        main()